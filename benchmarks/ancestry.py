@@ -0,0 +1,81 @@
+# Size and speed of AncestryIndex
+#
+# Usage: python benchmarks/ancestry.py [families] [queries]
+#
+# Writes a synthetic Gedcom file with given number of families
+# (default 40000, about 100000 individuals), builds an AncestryIndex
+# of it and prints the time it took, the number of bytes taken by the
+# index (its arrays of ids and of intervals of ancestor sets) and the
+# growth of resident memory of the process (read from /proc, so on
+# Linux only) while building it.  Then it
+# prints the time of is_relative() and lowest_common_ancestors() for
+# random pairs of individuals (default 10000 pairs).
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'simplepyged'))
+
+from ancestry import AncestryIndex
+from gedcom import Gedcom
+from synthetic import write_synthetic
+
+
+def resident_memory():
+    """ Return resident memory of the process in bytes """
+    return int(open('/proc/self/statm').read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def seconds_per_query(query, pairs):
+    start = time.time()
+    for (a, b) in pairs:
+        query(a, b)
+    return (time.time() - start) / len(pairs)
+
+
+def main():
+    families = 40000
+    queries = 10000
+    if len(sys.argv) > 1:
+        families = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        queries = int(sys.argv[2])
+
+    tmp = tempfile.mkdtemp()
+    try:
+        file = os.path.join(tmp, 'synthetic.ged')
+        write_synthetic(file, families)
+        g = Gedcom(file)
+    finally:
+        shutil.rmtree(tmp)
+
+    g.graph()
+    memory = resident_memory()
+    start = time.time()
+    index = AncestryIndex(g)
+    build = time.time() - start
+    memory = resident_memory() - memory
+
+    size = 0
+    for a in [index._ids, index._order, index._first, index._last, index._starts, index._ends]:
+        size += a.buffer_info()[1] * a.itemsize
+
+    individuals = g.individual_list()
+    print '%d individuals, %d families, %d intervals' % (len(individuals), len(g.family_list()), len(index._starts))
+    print '  build:            %6.2f s' % build
+    print '  index:            %6.1f MB' % (size / 1e6)
+    print '  resident memory: +%6.1f MB' % (memory / 1e6)
+
+    rng = random.Random(0)
+    pairs = [(rng.choice(individuals), rng.choice(individuals)) for i in xrange(queries)]
+    print '  is_relative:              %10.6f s/query' % seconds_per_query(index.is_relative, pairs)
+    print '  lowest_common_ancestors:  %10.6f s/query' % seconds_per_query(index.lowest_common_ancestors, pairs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,46 @@
+# Memory used by parsed lines of a Gedcom file
+#
+# Usage: python benchmarks/memory.py [file.ged]
+#
+# Prints the number of bytes taken by Line objects (including their
+# attribute dictionaries, lists of children and strings) per line of
+# the file.  Objects shared between lines are counted only once.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'simplepyged'))
+
+from gedcom import Gedcom
+
+
+def line_size(line, seen):
+    size = sys.getsizeof(line)
+    if hasattr(line, '__dict__'):
+        size += sys.getsizeof(line.__dict__)
+    # children_lines() would create lists for lines without children
+    for o in [line._child_lines(), line.xref(), line.tag(), line.value()]:
+        if id(o) not in seen:
+            seen.add(id(o))
+            size += sys.getsizeof(o)
+    return size
+
+
+def main():
+    if len(sys.argv) > 1:
+        file = sys.argv[1]
+    else:
+        file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'test', 'wright.ged')
+
+    lines = Gedcom(file).line_list()
+
+    seen = set()
+    total = 0
+    for line in lines:
+        total += line_size(line, seen)
+
+    print '%s: %d lines, %d bytes, %.1f bytes per line' % (os.path.basename(file), len(lines), total, float(total) / len(lines))
+
+
+if __name__ == '__main__':
+    main()
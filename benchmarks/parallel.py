@@ -0,0 +1,91 @@
+# Speed of parallel parsing with Gedcom(file, workers=N)
+#
+# Usage: python benchmarks/parallel.py [families] [workers ...]
+#
+# Writes a synthetic Gedcom file with given number of families
+# (default 5000), and measures separately the work done by worker
+# processes (tokenizing parts of the file into column stores) and the
+# work which is left to the main process (receiving and merging
+# column stores, and creating Line objects unless columns=True).
+# From these, prints the time of parsing with N workers if there are
+# at least N cores, and how many times faster it is than parsing
+# without workers.  Then it measures the actual time of parsing with
+# given numbers of workers (default 2 and 4) on this machine, which
+# depends on its number of cores.
+
+import cPickle
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'simplepyged'))
+
+from gedcom import Gedcom, LineColumns, _parse_chunk
+from synthetic import write_synthetic
+
+
+def seconds(function):
+    start = time.time()
+    result = function()
+    return (time.time() - start, result)
+
+
+def main():
+    families = 5000
+    workers = [2, 4]
+    if len(sys.argv) > 1:
+        families = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        workers = [int(n) for n in sys.argv[2:]]
+
+    tmp = tempfile.mkdtemp()
+    try:
+        file = os.path.join(tmp, 'synthetic.ged')
+        write_synthetic(file, families)
+        lines = sum(1 for line in open(file))
+        print '%d lines, %d cores' % (lines, multiprocessing.cpu_count())
+
+        (lines_time, g) = seconds(lambda: Gedcom(file))
+        (columns_time, g) = seconds(lambda: Gedcom(file, columns=True))
+        print '  without workers:   %6.2f s, %6.2f s with columns' % (lines_time, columns_time)
+
+        # work of worker processes, done here one part after another
+        chunks = g._split(file, 32)
+        (work, parts) = seconds(lambda: [_parse_chunk(chunk) for chunk in chunks])
+        pickled = [cPickle.dumps(part, 2) for part in parts]
+
+        # work left to the main process
+        (receive, parts) = seconds(lambda: [cPickle.loads(data) for data in pickled])
+        merged = LineColumns()
+        (merge, none) = seconds(lambda: [merged.extend(part) for part in parts])
+        merged.finish()
+        empty = os.path.join(tmp, 'empty.ged')
+        open(empty, 'w').close()
+        g = Gedcom(empty)
+        (build, none) = seconds(lambda: g._add_columns(merged))
+
+        print '  worker processes:  %6.2f s' % work
+        print '  main process:      %6.2f s receiving, %6.2f s merging, %6.2f s creating lines' % (receive, merge, build)
+
+        for (name, serial, reference) in [('lines', receive + merge + build, lines_time),
+                                          ('columns', receive + merge, columns_time)]:
+            print '  with %-8s   ' % (name + ':'),
+            for n in [2, 4, 8, 16, 32]:
+                t = serial + work / n
+                print '%2d: %5.2f s (%4.1fx)' % (n, t, reference / t),
+            print
+
+        for n in workers:
+            (t, g) = seconds(lambda: Gedcom(file, workers=n))
+            (c, g) = seconds(lambda: Gedcom(file, workers=n, columns=True))
+            print '  measured, %2d workers: %6.2f s, %6.2f s with columns' % (n, t, c)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
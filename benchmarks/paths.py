@@ -0,0 +1,122 @@
+# Speed of Individual.path_to_relative
+#
+# Usage: python benchmarks/paths.py [families] [queries]
+#
+# Writes a synthetic Gedcom file with given number of families
+# (default 5000), and finds paths between random pairs of relatives
+# among the youngest individuals (default 200 pairs) with
+# path_to_relative() and with the previous implementation, which
+# searched for the path recursively through all descendants of the
+# common ancestor.  path_to_relative() is timed both on records of a
+# file without a graph and on individuals which follow the graph of
+# the file (see Gedcom.graph()).  Prints the time per query.
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'simplepyged'))
+
+from gedcom import Gedcom
+from synthetic import write_synthetic
+
+
+def old_down_path(ancestor, descendant, distance = None):
+    if distance is not None:
+        if distance <= 0:
+            return None
+
+    if ancestor.children() == []:
+        return None
+
+    if descendant in ancestor.children():
+        return [ancestor]
+
+    for c in ancestor.children():
+        if distance is None:
+            path = old_down_path(c, descendant)
+        else:
+            path = old_down_path(c, descendant, distance - 1)
+        if path is not None:
+            path.insert(0, ancestor)
+            return path
+
+    return None
+
+
+def old_path_to_relative(self, relative):
+    """ Previous implementation, without building the list of steps """
+    common_ancestor = self.common_ancestor(relative)
+
+    if common_ancestor is None:
+        return None
+
+    if common_ancestor == self:
+        my_path = []
+    else:
+        my_path = old_down_path(common_ancestor, self, self.distance_to_ancestor(common_ancestor))
+
+    if common_ancestor == relative:
+        his_path = []
+    else:
+        his_path = old_down_path(common_ancestor, relative, relative.distance_to_ancestor(common_ancestor))
+
+    return (my_path, his_path)
+
+
+def seconds_per_query(path_to_relative, pairs):
+    start = time.time()
+    for (a, b) in pairs:
+        path_to_relative(a, b)
+    return (time.time() - start) / len(pairs)
+
+
+def main():
+    families = 5000
+    queries = 200
+    if len(sys.argv) > 1:
+        families = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        queries = int(sys.argv[2])
+
+    tmp = tempfile.mkdtemp()
+    try:
+        file = os.path.join(tmp, 'synthetic.ged')
+        write_synthetic(file, families)
+        g = Gedcom(file)
+        records = Gedcom(file)
+    finally:
+        shutil.rmtree(tmp)
+
+    individuals = g.individual_list()
+    # builds the graph too, so individuals of g follow it
+    index = g.ancestry_index()
+    # the youngest individuals have the most ancestors, and longest
+    # paths to their relatives
+    youngest = individuals[-len(individuals) // 10:]
+    rng = random.Random(0)
+    pairs = []
+    while len(pairs) < queries:
+        (a, b) = (rng.choice(youngest), rng.choice(youngest))
+        if a != b and index.is_relative(a, b):
+            pairs.append((a, b))
+
+    print '%d individuals, %d pairs of relatives' % (len(individuals), len(pairs))
+
+    new = seconds_per_query(lambda a, b: a.path_to_relative(b), pairs)
+    print '  path_to_relative:  %10.6f s/query with graph' % new
+
+    record_pairs = [(records.get_individual(a.xref()), records.get_individual(b.xref())) for (a, b) in pairs]
+    new = seconds_per_query(lambda a, b: a.path_to_relative(b), record_pairs)
+    print '  path_to_relative:  %10.6f s/query on records' % new
+
+    old = seconds_per_query(old_path_to_relative, record_pairs)
+    print '  previous version:  %10.6f s/query' % old
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+# Speed of loading Gedcom snapshots
+#
+# Usage: python benchmarks/snapshot.py [families]
+#
+# Writes a synthetic Gedcom file with given number of families
+# (default 5000), saves its snapshot, and prints the time it takes to
+# parse the file and to load it from the snapshot, both into Line
+# objects and into a column store (columns=True).
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'simplepyged'))
+
+from gedcom import Gedcom
+from synthetic import write_synthetic
+
+
+def seconds(function):
+    start = time.time()
+    function()
+    return time.time() - start
+
+
+def main():
+    families = 5000
+    if len(sys.argv) > 1:
+        families = int(sys.argv[1])
+
+    tmp = tempfile.mkdtemp()
+    try:
+        file = os.path.join(tmp, 'synthetic.ged')
+        snapshot = os.path.join(tmp, 'synthetic.snapshot')
+        write_synthetic(file, families)
+        Gedcom(file).save_snapshot(snapshot)
+        print '%d lines, snapshot of %d bytes' % (sum(1 for line in open(file)),
+                                                   os.path.getsize(snapshot))
+
+        for columns in [False, True]:
+            parse = seconds(lambda: Gedcom(file, columns=columns))
+            load = seconds(lambda: Gedcom(file, snapshot=snapshot, columns=columns))
+            print '  columns=%-5s  parse: %6.2f s   load: %6.2f s' % (columns, parse, load)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# Synthetic Gedcom files for benchmarks
+#
+# Usage: python benchmarks/synthetic.py file.ged [families]
+#
+# Writes a Gedcom file with a random, but reproducible, pedigree.
+# Founders are married among themselves, and their descendants are
+# married within the same generation, so larger files also contain
+# many cousin marriages (pedigree collapse).
+
+import random
+import sys
+
+SURNAMES = ['Smith', 'McIntyre', 'Wright', 'Horney', 'Hern', 'Merriman',
+            'Hyatt', 'Miller', 'Taylor', 'Brown', 'Walker', 'Young']
+MALE_NAMES = ['John', 'William', 'James', 'Archibald', 'Calvin', 'Ernest', 'Thomas']
+FEMALE_NAMES = ['Mary', 'Lucy', 'Carrie', 'Barbara', 'Marsha', 'Kimberly', 'Delores']
+PLACES = ['Louisiana, USA', 'Bastrop, Louisiana', 'Toronto, Ontario, Canada',
+          'Jefferson County, Mississippi, USA']
+
+
+class Person:
+    def __init__(self, number, sex, surname, year, rng):
+        self.xref = '@I%d@' % number
+        self.sex = sex
+        self.surname = surname
+        if sex == 'M':
+            self.given = rng.choice(MALE_NAMES)
+        else:
+            self.given = rng.choice(FEMALE_NAMES)
+        self.year = year
+        self.famc = None
+        self.fams = []
+
+
+def pedigree(families, seed=0):
+    """ Return (people, families) of a random pedigree with given
+    number of families.  Each family is a tuple (xref, husband, wife,
+    children, year of marriage). """
+    rng = random.Random(seed)
+    people = []
+    result = []
+
+    def person(sex, surname, year):
+        p = Person(len(people) + 1, sex, surname, year, rng)
+        people.append(p)
+        return p
+
+    year = 1500
+    generation = []
+    for i in range(max(2, families // 10)):
+        generation.append(person('MF'[i % 2], rng.choice(SURNAMES), year))
+
+    while len(result) < families:
+        men = [p for p in generation if p.sex == 'M']
+        women = [p for p in generation if p.sex == 'F']
+        rng.shuffle(men)
+        rng.shuffle(women)
+
+        year += 25
+        children = []
+        for (husband, wife) in zip(men, women):
+            if len(result) == families:
+                break
+            family = ('@F%d@' % (len(result) + 1), husband, wife, [], year)
+            husband.fams.append(family[0])
+            wife.fams.append(family[0])
+            for i in range(rng.randint(1, 4)):
+                child = person(rng.choice('MF'), husband.surname, year + 1 + 2 * i)
+                child.famc = family[0]
+                family[3].append(child)
+                children.append(child)
+            result.append(family)
+
+        if len(children) < 2:
+            # family line died out, start a new one
+            children.append(person('M', rng.choice(SURNAMES), year))
+            children.append(person('F', rng.choice(SURNAMES), year))
+        generation = children
+
+    return (people, result)
+
+
+def write_synthetic(path, families=10000, seed=0):
+    """ Write a Gedcom file with a random pedigree of given number of
+    families to path. """
+    rng = random.Random(seed)
+    (people, family_list) = pedigree(families, seed)
+
+    f = open(path, 'w')
+    w = lambda line: f.write(line + '\r\n')
+
+    w('0 HEAD')
+    w('1 SOUR simplepyged benchmark')
+    w('1 GEDC')
+    w('2 VERS 5.5')
+    w('1 CHAR UTF-8')
+    w('0 @S1@ SOUR')
+    w('1 TITL Synthetic records')
+
+    for p in people:
+        w('0 %s INDI' % p.xref)
+        w('1 NAME %s /%s/' % (p.given, p.surname))
+        w('2 GIVN %s' % p.given)
+        w('2 SURN %s' % p.surname)
+        w('1 SEX %s' % p.sex)
+        w('1 BIRT')
+        w('2 DATE %d %s %d' % (rng.randint(1, 28), rng.choice(['JAN', 'MAR', 'JUL', 'NOV']), p.year))
+        w('2 PLAC %s' % rng.choice(PLACES))
+        w('2 SOUR @S1@')
+        w('3 PAGE Birth register, page %d' % rng.randint(1, 500))
+        if p.year < 1930:
+            w('1 DEAT')
+            w('2 DATE %d' % (p.year + rng.randint(1, 90)))
+        if p.famc is not None:
+            w('1 FAMC %s' % p.famc)
+        for fams in p.fams:
+            w('1 FAMS %s' % fams)
+        w('1 NOTE Synthetic individual')
+
+    for (xref, husband, wife, children, year) in family_list:
+        w('0 %s FAM' % xref)
+        w('1 HUSB %s' % husband.xref)
+        w('1 WIFE %s' % wife.xref)
+        w('1 MARR')
+        w('2 DATE %d' % year)
+        for child in children:
+            w('1 CHIL %s' % child.xref)
+
+    w('0 TRLR')
+    f.close()
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 2:
+        write_synthetic(sys.argv[1], int(sys.argv[2]))
+    else:
+        write_synthetic(sys.argv[1])
@@ -0,0 +1,60 @@
+# Speed of the Gedcom line tokenizer
+#
+# Usage: python benchmarks/tokenizer.py [file.ged ...]
+#
+# For each file, prints the number of lines per second tokenized by
+# the regular expression based tokenizer and by the step by step
+# tokenizer (which is still used to report errors), and the time it
+# takes to parse the whole file.  Without arguments, uses
+# test/TGC55CLF.utf-8.ged and a synthetic file with 20000 families.
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, '..', 'simplepyged'))
+
+from gedcom import Gedcom, _tokenize, _tokenize_checked
+from synthetic import write_synthetic
+
+
+def lines_per_second(tokenize, lines):
+    start = time.time()
+    for (number, line) in enumerate(lines):
+        tokenize(number, line)
+    return len(lines) / (time.time() - start)
+
+
+def benchmark(file):
+    lines = [line.decode("utf-8-sig") for line in open(file)]
+    print os.path.basename(file) + ': %d lines' % len(lines)
+    print '  regular expression: %10.0f lines/s' % lines_per_second(_tokenize, lines)
+    print '  step by step:       %10.0f lines/s' % lines_per_second(_tokenize_checked, lines)
+
+    start = time.time()
+    Gedcom(file)
+    print '  parsing:            %10.3f s' % (time.time() - start)
+
+
+def main():
+    if len(sys.argv) > 1:
+        for file in sys.argv[1:]:
+            benchmark(file)
+        return
+
+    benchmark(os.path.join(here, '..', 'test', 'TGC55CLF.utf-8.ged'))
+
+    tmp = tempfile.mkdtemp()
+    try:
+        file = os.path.join(tmp, 'synthetic.ged')
+        write_synthetic(file, 20000)
+        benchmark(file)
+    finally:
+        shutil.rmtree(tmp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,307 @@
+#-*- coding: utf-8 -*-
+#
+# Gedcom 5.5 Parser
+#
+# Copyright (C) 2010 Nikola Škorić (nskoric [ at ] gmail.com)
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# Please see the GPL license at http://www.gnu.org/licenses/gpl.txt
+#
+# To contact the author, see http://github.com/dijxtra/simplepyged
+
+# Global imports
+from array import array
+from bisect import bisect_right
+from graph import _union
+
+class AncestryIndex:
+    """ Index of ancestors of all individuals in a Gedcom file
+
+    Building the index computes the set of ancestors of every
+    individual once, after which questions like "are these two
+    individuals related?" or "is this individual an ancestor of that
+    one?" are answered by intersecting two sets instead of searching
+    through the family tree.
+
+    Each individual gets an id, such that ancestors have smaller ids
+    than their descendants, and ancestors of an individual mostly have
+    consecutive ids (ids are given in depth-first order, starting from
+    individuals without children).  A set of ancestors is then stored
+    as a list of intervals of ids, which is much shorter than the set
+    itself.  Sets are stored only for families: the set of a family
+    holds its husband and wife and all of their ancestors, and
+    ancestors of an individual are the individual itself and members
+    of sets of its parent families.  Distances to ancestors are
+    computed the first time they are needed for an individual, and
+    are then remembered.
+
+    The index is built from the FamilyGraph of the Gedcom file (see
+    Gedcom.graph()), and reflects the file at the time it was built.
+
+    Example:
+.. code-block:: python
+
+    gedcom = Gedcom(somefile)
+    index = AncestryIndex(gedcom)
+    relatives = [c for c in candidates if index.is_relative(individual, c)]
+    """
+
+    def __init__(self, gedcom):
+        self._graph = gedcom.graph()
+        self._ids = array('i', [-1]) * len(self._graph)
+        self._order = array('i')
+        self._distances = {}
+
+        # individuals without children first, so that ancestors of
+        # each of them get consecutive ids
+        for i in xrange(len(self._graph)):
+            if len(self._graph.children_of(i)) == 0:
+                self._add(i)
+        for i in xrange(len(self._graph)):
+            self._add(i)
+
+        self._label_families()
+
+    def is_ancestor(self, ancestor, individual):
+        """ Determine if ancestor is an ancestor of individual (or the
+        individual itself) """
+        a = self._id(ancestor)
+        i = self._graph.id(individual)
+        if a == self._ids[i]:
+            return True
+        for f in self._graph.parent_families_of(i):
+            n = bisect_right(self._starts, a, self._first[f], self._last[f]) - 1
+            if n >= self._first[f] and self._ends[n] >= a:
+                return True
+        return False
+
+    def is_relative(self, individual, candidate):
+        """ Determine if individual and candidate have a common ancestor
+        (as in Individual.is_relative()) """
+        if candidate is None:
+            return False
+        for interval in _intersection(self._intervals(individual), self._intervals(candidate)):
+            return True
+        return False
+
+    def ancestors(self, individual):
+        """ Return a list of all ancestors of individual """
+        i = self._id(individual)
+        return [self._individual(a) for a in _ids_in(self._intervals(individual)) if a != i]
+
+    def common_ancestors(self, individual, relative):
+        """ Return a list of all common ancestors of individual and
+        relative.  The list includes individual if it is an ancestor
+        of relative, and vice versa. """
+        return [self._individual(a) for a in self._common(individual, relative)]
+
+    def common_ancestor(self, individual, relative):
+        """ Return the nearest common ancestor of individual and
+        relative, or None if they are not relatives.
+
+        The nearest common ancestor is the one whose greater distance
+        to individual and relative is the smallest, with ties broken
+        by the sum of those distances.
+        """
+        if relative is None:
+            return None
+
+        lowest = self.lowest_common_ancestors(individual, relative)
+        if lowest == []:
+            return None
+
+        lowest.sort(key=lambda (a, d1, d2): (max(d1, d2), d1 + d2))
+        return lowest[0][0]
+
+    def lowest_common_ancestors(self, individual, relative):
+        """ Return lowest common ancestors of individual and relative
+        (as in Individual.lowest_common_ancestors()) as a list of
+        tuples (ancestor, distance from individual, distance from
+        relative), ordered by the sum of distances. """
+        common = self._common(individual, relative)
+
+        # a common ancestor isn't lowest if one of its children is a
+        # common ancestor too
+        higher = set()
+        for a in common:
+            higher.update(self._parents(a))
+
+        mine = self._distances_of(self._id(individual))
+        his = self._distances_of(self._id(relative))
+        lowest = [(self._individual(a), mine[a], his[a])
+                  for a in common if a not in higher]
+        lowest.sort(key=lambda (a, d1, d2): (d1 + d2, d1))
+        return lowest
+
+    def distance_to_ancestor(self, individual, ancestor):
+        """ Distance from individual to an ancestor in number of
+        generations (as in Individual.distance_to_ancestor()), or None
+        if ancestor is not an ancestor of individual. """
+        return self._distances_of(self._id(individual)).get(self._id(ancestor))
+
+    # Private methods
+
+    def _add(self, i):
+        """ Give ids to i-th individual of the graph and all of its
+        ancestors which don't have one yet, ancestors first """
+        if self._ids[i] >= 0:
+            return
+
+        graph = self._graph
+        # depth-first search, which gives an id to an individual only
+        # after all of its parents have one
+        in_progress = set([i])
+        stack = [(i, iter(graph.parents_of(i)))]
+        while stack != []:
+            (person, parents) = stack[-1]
+            for parent in parents:
+                if self._ids[parent] >= 0:
+                    continue
+                if parent in in_progress:
+                    # individual is its own ancestor, which can only
+                    # happen in a broken file; ignore that link
+                    continue
+                in_progress.add(parent)
+                stack.append((parent, iter(graph.parents_of(parent))))
+                break
+            else:
+                stack.pop()
+                in_progress.remove(person)
+                self._ids[person] = len(self._order)
+                self._order.append(person)
+
+    def _label_families(self):
+        """ Store the set of ancestors of every family as intervals of
+        ids: interval n is from _starts[n] to _ends[n] (inclusive),
+        and intervals of family f are those from _first[f] to
+        _last[f] (exclusive) """
+        graph = self._graph
+        self._first = array('i', [0]) * graph.family_count()
+        self._last = array('i', [0]) * graph.family_count()
+        self._starts = array('i')
+        self._ends = array('i')
+
+        spouses = [[self._ids[p] for p in (graph.husbands[f], graph.wives[f]) if p >= 0]
+                   for f in xrange(graph.family_count())]
+        # parent families of spouses have spouses with smaller ids,
+        # so they are labelled first, unless the file is broken and
+        # individuals are their own ancestors
+        order = sorted((max(ids), f) for (f, ids) in enumerate(spouses) if ids != [])
+        labelled = array('b', [0]) * graph.family_count()
+        for (last, f) in order:
+            intervals = []
+            for a in spouses[f]:
+                intervals.append((a, a))
+                for parent_family in graph.parent_families_of(self._order[a]):
+                    if labelled[parent_family]:
+                        intervals.extend(self._label(parent_family))
+
+            (starts, ends) = zip(*_union(intervals))
+            self._first[f] = len(self._starts)
+            self._starts.extend(starts)
+            self._ends.extend(ends)
+            self._last[f] = len(self._starts)
+            labelled[f] = 1
+
+    def _label(self, f):
+        """ Return intervals of ancestors of family f """
+        (first, last) = (self._first[f], self._last[f])
+        return zip(self._starts[first:last], self._ends[first:last])
+
+    def _id(self, individual):
+        return self._ids[self._graph.id(individual)]
+
+    def _individual(self, a):
+        return self._graph.individual(self._order[a])
+
+    def _parents(self, a):
+        """ Return ids of parents of individual with id a """
+        return [self._ids[p] for p in self._graph.parents_of(self._order[a])]
+
+    def _intervals(self, individual):
+        """ Return the set of ancestors of individual (including
+        itself) as a sorted list of intervals (start, end) """
+        i = self._graph.id(individual)
+        a = self._ids[i]
+        families = self._graph.parent_families_of(i)
+        if len(families) == 1:
+            # ancestors have smaller ids, so a usually only has to be
+            # added at the end
+            intervals = self._label(families[0])
+            if intervals == []:
+                return [(a, a)]
+            (start, end) = intervals[-1]
+            if end == a - 1:
+                intervals[-1] = (start, a)
+                return intervals
+            if end < a:
+                intervals.append((a, a))
+                return intervals
+
+        intervals = [(a, a)]
+        for f in families:
+            intervals.extend(self._label(f))
+        return _union(intervals)
+
+    def _common(self, individual, relative):
+        """ Return a list of ids of common ancestors of individual and
+        relative """
+        return _ids_in(_intersection(self._intervals(individual), self._intervals(relative)))
+
+    def _distances_of(self, i):
+        """ Return a dictionary which maps ids of ancestors of i-th
+        individual (including itself) to their distances """
+        try:
+            return self._distances[i]
+        except KeyError:
+            pass
+
+        distances = {i: 0}
+        generation = [i]
+        distance = 0
+        while generation != []:
+            distance += 1
+            new = []
+            for j in generation:
+                for p in self._parents(j):
+                    if p not in distances:
+                        distances[p] = distance
+                        new.append(p)
+            generation = new
+
+        self._distances[i] = distances
+        return distances
+
+def _intersection(a, b):
+    """ Generate intervals which are in both sorted lists of disjoint
+    intervals a and b """
+    (i, j) = (0, 0)
+    while i < len(a) and j < len(b):
+        start = max(a[i][0], b[j][0])
+        end = min(a[i][1], b[j][1])
+        if start <= end:
+            yield (start, end)
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+
+def _ids_in(intervals):
+    """ Return a list of ids in intervals """
+    ids = []
+    for (start, end) in intervals:
+        ids.extend(xrange(start, end + 1))
+    return ids
@@ -0,0 +1,169 @@
+#-*- coding: utf-8 -*-
+#
+# Gedcom 5.5 Parser
+#
+# Copyright (C) 2010 Nikola Škorić (nskoric [ at ] gmail.com)
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# Please see the GPL license at http://www.gnu.org/licenses/gpl.txt
+#
+# To contact the author, see http://github.com/dijxtra/simplepyged
+
+# Global imports
+from array import array
+
+class LineColumns(object):
+    """ Lines of a Gedcom file stored column by column
+
+    Instead of one Line object per line, levels, parents, tags, xrefs
+    and values of all lines are kept in parallel arrays indexed by the
+    number of the line (counting from 0).  Tags and xrefs are stored
+    as ids into tables of distinct tags and xrefs, and values are
+    stored in a single UTF-8 encoded buffer.
+
+    Used by Gedcom parser when it is created with columns=True.
+    """
+
+    def __init__(self):
+        self.levels = array('b')
+        self.parents = array('i')
+        self.tag_ids = array('i')
+        self.xref_ids = array('i')
+        self.value_offsets = array('L', [0])
+        self.values = ''
+        self.tags = []
+        self.xrefs = []
+
+        # state used only while lines are appended
+        self._tag_ids = {}
+        self._xref_ids = {}
+        self._ancestors = []
+        self._chunks = []
+        self._values = []
+
+    def __len__(self):
+        return len(self.levels)
+
+    def append(self,level,xref,tag,value):
+        """ Append a line. Level of the line must not be greater than
+        the level of the previous line plus one. """
+        del self._ancestors[level:]
+        if self._ancestors:
+            self.parents.append(self._ancestors[-1])
+        else:
+            self.parents.append(-1)
+        self._ancestors.append(len(self.levels))
+
+        self.levels.append(level)
+        self.tag_ids.append(self._id(tag, self.tags, self._tag_ids))
+        if xref != '':
+            self.xref_ids.append(self._id(xref, self.xrefs, self._xref_ids))
+        else:
+            self.xref_ids.append(-1)
+
+        value = value.encode("utf-8")
+        self.value_offsets.append(self.value_offsets[-1] + len(value))
+        self._values.append(value)
+        if len(self._values) >= 4096:
+            self._chunks.append(''.join(self._values))
+            self._values = []
+
+    def extend(self,other):
+        """ Append all lines of another, finished, LineColumns.  Its
+        first line must be a record (have level 0). """
+        offset = len(self.levels)
+        tag_ids = [self._id(tag, self.tags, self._tag_ids) for tag in other.tags]
+        # xref id -1 (no xref) stays -1
+        xref_ids = [self._id(xref, self.xrefs, self._xref_ids) for xref in other.xrefs] + [-1]
+
+        self.levels.extend(other.levels)
+        self.parents.extend(array('i', [p + offset if p >= 0 else -1 for p in other.parents]))
+        self.tag_ids.extend(array('i', [tag_ids[i] for i in other.tag_ids]))
+        self.xref_ids.extend(array('i', [xref_ids[i] for i in other.xref_ids]))
+
+        end = self.value_offsets[-1]
+        self.value_offsets.extend(array('L', [end + o for o in other.value_offsets[1:]]))
+        self._chunks.append(''.join(self._values))
+        self._chunks.append(other.values)
+        self._values = []
+        self._ancestors = []
+
+    def finish(self):
+        """ Join values into a single buffer.  Must be called after the
+        last line is appended. """
+        self._chunks.append(''.join(self._values))
+        self.values = ''.join(self._chunks)
+        self._chunks = []
+        self._values = []
+        self._ancestors = []
+        self._xref_ids = {}
+
+    def tostrings(self):
+        """ Return all lines as a tuple of strings and lists of strings,
+        from which they can be restored by fromstrings().  Must be
+        called after finish(). """
+        return (self.tags, self.xrefs, self.levels.tostring(), self.parents.tostring(),
+                self.tag_ids.tostring(), self.xref_ids.tostring(),
+                self.value_offsets.tostring(), self.values)
+
+    @classmethod
+    def fromstrings(cls,strings):
+        """ Return a finished LineColumns with lines returned by
+        tostrings() """
+        columns = cls()
+        (columns.tags, columns.xrefs, levels, parents, tag_ids, xref_ids,
+         value_offsets, columns.values) = strings
+        columns.levels = array('b', levels)
+        columns.parents = array('i', parents)
+        columns.tag_ids = array('i', tag_ids)
+        columns.xref_ids = array('i', xref_ids)
+        columns.value_offsets = array('L', value_offsets)
+        return columns
+
+    def level(self,i):
+        """ Return the level of i-th line """
+        return self.levels[i]
+
+    def xref(self,i):
+        """ Return the xref of i-th line """
+        if self.xref_ids[i] < 0:
+            return u''
+        return self.xrefs[self.xref_ids[i]]
+
+    def tag(self,i):
+        """ Return the tag of i-th line """
+        return self.tags[self.tag_ids[i]]
+
+    def value(self,i):
+        """ Return the value of i-th line """
+        return self.values[self.value_offsets[i]:self.value_offsets[i + 1]].decode("utf-8")
+
+    def parent(self,i):
+        """ Return the number of the parent line of i-th line, or -1
+        if i-th line is a record """
+        return self.parents[i]
+
+    def line(self,i):
+        """ Return a tuple (level, xref, tag, value) of i-th line """
+        return (self.level(i), self.xref(i), self.tag(i), self.value(i))
+
+    def _id(self,key,keys,ids):
+        try:
+            return ids[key]
+        except KeyError:
+            ids[key] = len(keys)
+            keys.append(key)
+            return ids[key]
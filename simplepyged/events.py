@@ -29,16 +29,21 @@ class Event:
         self.line = line
         self.tag = self.line.tag()
 
-        self.type = self._get_value('TYPE')
-        self.date = self._get_value('DATE')
-        self.place = self._get_value('PLAC')
+        (self.type, self.date, self.place) = self._get_values(['TYPE', 'DATE', 'PLAC'])
 
     def _get_value(self, tag):
         """ Returns value of a child tag"""
-        try:
-            return self.line.children_tags(tag)[0].value()
-        except IndexError:
-            return None
+        return self._get_values([tag])[0]
+
+    def _get_values(self, tags):
+        """ Returns list of values of first child lines with given tags
+        (None for missing tags), found in a single pass over child lines """
+        values = dict.fromkeys(tags)
+        for c in reversed(self.line._child_lines()):
+            if c.tag() in values:
+                values[c.tag()] = c.value()
+
+        return [values[tag] for tag in tags]
         
     def dateplace(self):
         """ Returns a pair of strings in format (date, place) """
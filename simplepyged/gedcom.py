@@ -27,8 +27,45 @@
 # __all__ = ["Gedcom", "Line", "GedcomParseError"]
 
 # Global imports
+import os
+import re
 import string
+import codecs
+import hashlib
+import marshal
+import mmap
+import multiprocessing
+import weakref
+from array import array
+from bisect import bisect_right
+from collections import Sequence
+from UserDict import DictMixin
 from records import *
+from columns import LineColumns
+from ancestry import AncestryIndex
+from graph import FamilyGraph, CycleError
+from kinship import Kinship
+
+_SNAPSHOT_FORMAT = ('simplepyged snapshot', 3)
+
+# a well-formed line: Level SP (Xref SP)? Tag (SP Value)?
+_LINE = re.compile(r'([0-9]+) (?:(@[^ ]*@) ([^ ]+)|([^@ ][^ ]*))(?: (.*))?$', re.DOTALL)
+
+# end of line before a record, i.e. before a line with level 0, which
+# can be indented like any other line
+_RECORD_START = re.compile(r'\n[^\S\n]*0+ ')
+
+# classes of records, by tag
+_RECORD_CLASSES = {
+    "INDI": Individual,
+    "FAM": Family,
+    "OBJE": Multimedia,
+    "NOTE": Note,
+    "REPO": Repository,
+    "SOUR": Source,
+    "SUBN": Submission,
+    "SUBM": Submitter,
+    }
 
 class Gedcom:
     """ Gedcom parser
@@ -44,12 +81,70 @@ class Gedcom:
     dictionary (only lines that represent records: the key to the
     dictionary is a unique identifier of each record).
 
+    If lazy is True, the file is not parsed up front. Instead, the
+    file is memory-mapped and scanned once to find the byte offset of
+    every record, and each record is parsed only when it is accessed
+    for the first time (through get_record(), record_dict() or a
+    cross-reference from another record).  This makes looking up a
+    handful of records in a huge file cheap.  Methods which return
+    all lines or all records of some type (line_list(),
+    individual_list(), family_list()) parse all the records they
+    return.
+
+    If workers is greater than 1, the file is split into that many
+    parts (each of them starting with a record) which are parsed in
+    parallel by a pool of worker processes.  Each worker tokenizes its
+    part into a column store (see LineColumns), and column stores of
+    all parts are then merged in their original order.  Together with
+    columns, this is nearly all of the work of parsing.  Without
+    columns, Line objects still have to be created one by one in the
+    main process, which is most of the time of parsing, so workers
+    help mostly together with columns.  benchmarks/parallel.py
+    measures how the work is divided between workers and the main
+    process.
+
+    If columns is True, lines are not kept as Line objects, but in a
+    much more compact column-oriented store (see LineColumns).  Line
+    objects of a record are created when the record is accessed, and
+    are freed once they are no longer used.  line_list(),
+    individual_list() and family_list() return sequences which create
+    records as they are accessed.
+
+    Lazy parsing can't be used together with columns, workers or
+    snapshot; ValueError is raised if they are combined.
+
+    Parsing can be limited to some types of records and some tags.
+    If record_types is given, only records with those tags (e.g.
+    ['INDI', 'FAM']) are parsed.  If tags is given, only those child
+    lines of records whose tags are in tags (e.g. ['NAME', 'BIRT',
+    'FAMS']) are parsed, together with all of their own child lines.
+    Lines which are left out are skipped without being tokenized (and
+    thus also without being checked for errors).
+
+    If snapshot is a path to a snapshot file (see save_snapshot()) of
+    this Gedcom file, lines are loaded from the snapshot instead of
+    parsing the file.  If the snapshot does not exist or the file has
+    changed since the snapshot was saved, the file is parsed and the
+    snapshot is saved anew.
+
     """
 
-    def __init__(self,file):
+    def __init__(self,file,lazy=False,workers=1,snapshot=None,columns=False,
+                 record_types=None,tags=None):
         """ Initialize a Gedcom parser. You must supply a Gedcom file.
         """
-        self._record_dict = {}
+        if lazy and (columns or workers > 1 or snapshot is not None):
+            raise ValueError("Lazy parsing can't be used together with columns, workers or snapshot")
+
+        self._file = os.path.abspath(file)
+        self._record_types = _optional_set(record_types)
+        self._tags = _optional_set(tags)
+        if lazy:
+            self._record_dict = _RecordIndex(self)
+        elif columns:
+            self._record_dict = _ColumnIndex(self)
+        else:
+            self._record_dict = {}
         self._line_list = []
         self._individual_list = []
         self._family_list = []
@@ -57,7 +152,85 @@ class Gedcom:
         self._current_level = -1
         self._current_line = self._line_top
         self._individuals = 0
-        self._parse(file)
+        self._strings = {}
+        self._ancestry_index = None
+        self._graph = None
+        self._graph_attached = False
+        self._kinship = None
+        if lazy:
+            self._index(file)
+        elif snapshot is not None and self._load_snapshot(snapshot):
+            pass
+        else:
+            if workers > 1:
+                self._parse_parallel(file,workers)
+            elif columns:
+                self._parse_columns(file)
+            else:
+                self._parse(file)
+            if snapshot is not None:
+                self.save_snapshot(snapshot)
+
+    @classmethod
+    def load_snapshot(cls,path):
+        """ Return a Gedcom object of the file from which the snapshot
+        at path was saved.
+
+        The snapshot is used only if the file has not changed since
+        the snapshot was saved.  Otherwise, the file is parsed again
+        and the snapshot is refreshed.  Raises ValueError if path is
+        not a snapshot, or a snapshot saved in another format by
+        another version of simplepyged.
+        """
+        f = open(path, 'rb')
+        try:
+            try:
+                header = marshal.load(f)
+            except (EOFError, ValueError, TypeError):
+                header = None
+        finally:
+            f.close()
+
+        if not _is_snapshot_header(header):
+            raise ValueError("Not a snapshot in the current format: " + path)
+
+        (format, file, size, mtime, digest, record_types, tags) = header
+        return cls(file, snapshot=path, record_types=record_types, tags=tags)
+
+    def save_snapshot(self,path):
+        """ Save all lines of the Gedcom file into a snapshot file at
+        path, from which they can be loaded again without parsing.
+
+        The snapshot is a compact binary file, which holds lines in
+        the same arrays as the column store (see LineColumns): tags
+        and xrefs are stored once and referred to by integer ids, and
+        the tree of lines is flattened into arrays of levels and
+        numbers of parent lines.  Loading a snapshot only reads these
+        arrays, which are then either used as the column store, or
+        from which Line objects are created and linked directly.  It
+        also records size, modification time and MD5 hash of the
+        Gedcom file, so that a snapshot of a file which has changed
+        is never loaded.
+        """
+        if isinstance(self._record_dict, _ColumnIndex):
+            columns = self._record_dict.columns
+        else:
+            columns = LineColumns()
+            for e in self.line_list():
+                columns.append(e.level(),e.xref(),e.tag(),e.value())
+            columns.finish()
+
+        stat = os.stat(self._file)
+        header = (_SNAPSHOT_FORMAT, self._file, stat.st_size, stat.st_mtime,
+                  _file_digest(self._file), _sorted_or_none(self._record_types),
+                  _sorted_or_none(self._tags))
+
+        f = open(path, 'wb')
+        try:
+            marshal.dump(header, f)
+            marshal.dump(columns.tostrings(), f)
+        finally:
+            f.close()
 
     def record_dict(self):
         """ Return a dictionary of records from the Gedcom file.  Only
@@ -70,20 +243,80 @@ class Gedcom:
         """ Return a list of all the lines in the Gedcom file.  The
         lines are in the same order as they appeared in the file.
         """
+        if self._lazy():
+            return self._record_dict.lines()
+
         return self._line_list
 
     def individual_list(self):
         """ Return a list of all the individuals in the Gedcom file.  The
         individuals are in the same order as they appeared in the file.
         """
+        if self._lazy():
+            return self._record_dict.records("INDI")
+
         return self._individual_list
 
     def family_list(self):
         """ Return a list of all the families in the Gedcom file.  The
         families are in the same order as they appeared in the file.
         """
+        if self._lazy():
+            return self._record_dict.records("FAM")
+
         return self._family_list
 
+    def ancestry_index(self):
+        """ Return an AncestryIndex of all individuals in the Gedcom
+        file.  The index is built on the first call, and the same index
+        is returned by later calls.
+        """
+        if self._ancestry_index is None:
+            self._ancestry_index = AncestryIndex(self)
+
+        return self._ancestry_index
+
+    def graph(self):
+        """ Return a FamilyGraph of all individuals and families in the
+        Gedcom file.  The graph is built on the first call, and the
+        same graph is returned by later calls.
+
+        Building the graph doesn't change how records behave; see
+        attach_graph() for that.
+        """
+        if self._graph is None:
+            self._graph = FamilyGraph(self)
+
+        return self._graph
+
+    def attach_graph(self):
+        """ Make individuals of the Gedcom file follow its FamilyGraph
+        (see graph(), which is built if needed) in their parents(),
+        children(), down_path() and path_to_relative(), instead of
+        reading their records.  Return the graph.
+
+        These methods then show the family tree as it was when the
+        graph was built, and don't see later changes of records.
+        Individuals which are created later (in a lazily parsed file
+        or a file stored in columns) follow the graph too.
+        """
+        graph = self.graph()
+        self._graph_attached = True
+        for e in self.individual_list():
+            e._graph = graph
+
+        return graph
+
+    def kinship(self):
+        """ Return a Kinship of all individuals in the Gedcom file.  It
+        is created on the first call, and the same object (with all
+        coefficients computed so far) is returned by later calls.
+        """
+        if self._kinship is None:
+            self._kinship = Kinship(self)
+
+        return self._kinship
+
     def get_record(self, xref):
         """ Return an object of class Record (or it's subclass) identified by xref """
         return self.record_dict()[xref]
@@ -106,78 +339,254 @@ class Gedcom:
 
     # Private methods
 
+    def _load_snapshot(self,path):
+        """ Load lines from a snapshot. Return False if the snapshot
+        can't be used. """
+        try:
+            f = open(path, 'rb')
+        except IOError:
+            return False
+
+        try:
+            try:
+                if not self._snapshot_fresh(marshal.load(f)):
+                    return False
+                columns = LineColumns.fromstrings(marshal.load(f))
+            except (EOFError, ValueError, TypeError):
+                return False
+        finally:
+            f.close()
+
+        if isinstance(self._record_dict, _ColumnIndex):
+            self._record_dict.columns = columns
+            self._record_dict.add_records()
+        else:
+            self._add_columns(columns)
+
+        return True
+
+    def _snapshot_fresh(self,header):
+        """ Check if snapshot with given header was saved from the
+        current version of the Gedcom file. """
+        if not _is_snapshot_header(header):
+            return False
+        (format, file, size, mtime, digest, record_types, tags) = header
+        if file != self._file:
+            return False
+        if (record_types != _sorted_or_none(self._record_types) or
+            tags != _sorted_or_none(self._tags)):
+            return False
+
+        stat = os.stat(self._file)
+        if stat.st_size != size:
+            return False
+        if stat.st_mtime == mtime:
+            return True
+
+        # file was touched, but its content may still be the same
+        return _file_digest(self._file) == digest
+
+    def _lazy(self):
+        return isinstance(self._record_dict, _RecordIndex)
+
+    def _collect_lines(self,line,lines):
+        lines.append(line)
+        for c in line._child_lines():
+            self._collect_lines(c, lines)
+
     def _parse(self,file):
-        # open file
-        # go through the lines
-        f = open(file)
-        number = 1
-        for line in f.readlines():
-            self._parse_line(number,line.decode("utf-8-sig"))
-            number += 1
+        for record in self._parse_records(file):
+            pass
 
         for e in self.line_list():
             e._init()
 
-    def _parse_line(self,number,line):
-        # each line should have: Level SP (Xref SP)? Tag (SP Value)? (SP)? NL
-        # parse the line
-        tail = line.strip()
+    def _parse_parallel(self,file,workers):
+        # worker processes tokenize parts of the file into compact
+        # column stores, which are cheap to send back and to merge;
+        # only creating Line objects (if columns aren't used) is left
+        # to this process
+        pool = multiprocessing.Pool(workers)
+        try:
+            chunks = pool.map(_parse_chunk, self._split(file,workers))
+            pool.close()
+        finally:
+            pool.terminate()
+
+        if isinstance(self._record_dict, _ColumnIndex):
+            columns = self._record_dict.columns
+        else:
+            columns = LineColumns()
+        for chunk in chunks:
+            columns.extend(chunk)
+        columns.finish()
 
-        if tail == '':
-            self._error(number,"Empty line")
+        if isinstance(self._record_dict, _ColumnIndex):
+            self._record_dict.add_records()
+        else:
+            self._add_columns(columns)
 
+    def _split(self,file,workers):
+        """ Split file into parts of about the same size, each of them
+        starting with a record. """
+        f = open(file, 'rb')
         try:
-            [head, tail] = tail.split(' ', 1)
-        except ValueError:
-            self._error(number,"Incomplete line")
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return []
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
+
+        chunks = []
+        try:
+            start = 0
+            number = 1
+            while start < size:
+                end = _find_record(mm, max(start, size * (len(chunks) + 1) // workers))
+                if end < 0:
+                    end = size
+                chunks.append((file, start, end, number, self._record_types, self._tags))
+                number += mm[start:end].count('\n')
+                start = end
+        finally:
+            mm.close()
+
+        return chunks
 
-        l = self._level(number,head) #retireve line level
+    def _parse_records(self,file):
+        """ Parse the file line by line, yielding each record as soon as
+        all of its lines are parsed. """
+        f = open(file)
+        try:
+            record = None
+            for (number, line) in _select(f,1,self._record_types,self._tags):
+                e = self._parse_line(number,line.decode("utf-8-sig"))
+                if e.level() == 0:
+                    if record is not None:
+                        yield record
+                    record = e
+        finally:
+            f.close()
 
+        if record is not None:
+            yield record
+
+    def _index(self,file):
+        """ Find the byte offset of every record by a single scan over
+        the memory-mapped file. """
+        f = open(file, 'rb')
         try:
-            [head, tail] = tail.split(' ', 1)
-        except ValueError:
-            [head, tail] = [tail, '']
-        p = self._xref(number,head) #retrieve line xref if it exists
-        if p != '':
-            try:
-                [head, tail] = tail.split(' ', 1)
-            except ValueError:
-                [head, tail] = [tail, '']
-        t = self._tag(number,head) #retrieve line tag
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            f.close()
 
-        v = tail #retrieve value of tag if it exists
-        
+        mm = self._mmap
+        pos = 0
+        if mm[:len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+            pos = len(codecs.BOM_UTF8)
+
+        while pos >= 0:
+            eol = mm.find('\n', pos)
+            if eol < 0:
+                eol = size
+            header = mm[pos:eol].decode("utf-8").split()
+            if len(header) > 2 and header[1].startswith('@'):
+                (xref, tag) = (header[1], header[2])
+            elif len(header) > 1:
+                (xref, tag) = (u'', header[1])
+            else:
+                (xref, tag) = (u'', u'')
+            if self._record_types is None or tag in self._record_types:
+                self._record_dict.add(pos, xref, tag)
+            pos = _find_record(mm, eol)
+
+    def _parse_record(self,start,end):
+        """ Parse a record located between given byte offsets of the
+        memory-mapped file. """
+        lines = self._mmap[start:end].split('\n')
+        if lines[-1] == '':
+            lines.pop()
+
+        try:
+            return self._parse_record_lines(1, lines)
+        except GedcomParseError:
+            # parse again, so that the error reports the line number
+            # within the whole file
+            number = self._mmap[:start].count('\n') + 1
+            return self._parse_record_lines(number, lines)
+
+    def _parse_record_lines(self,number,lines):
+        tokens = []
+        for (number, line) in _select(lines,number,self._record_types,self._tags):
+            tokens.append((number,) + _tokenize(number,line.decode("utf-8")))
+
+        return self._build_record(tokens)
+
+    def _build_record(self,tokens):
+        """ Create lines of a single record from their tokens """
+        self._current_level = -1
+        self._current_line = self._line_top
+
+        record_lines = []
+        for (number,l,p,t,v) in tokens:
+            record_lines.append(self._add_line(number,l,p,t,v))
+
+        for e in record_lines:
+            e._init()
+
+        record = record_lines[0]
+        if self._graph_attached and isinstance(record, Individual):
+            record._graph = self._graph
+
+        return record
+
+    def _parse_columns(self,file):
+        f = open(file)
+        try:
+            _fill_columns(self._record_dict.columns,f,1,self._record_types,self._tags)
+        finally:
+            f.close()
+
+        self._record_dict.columns.finish()
+        self._record_dict.add_records()
+
+    def _load_columns(self,start,end):
+        """ Create lines of a record stored in given range of lines of
+        the column store. """
+        columns = self._record_dict.columns
+        record = self._build_record([(i + 1,) + columns.line(i)
+                                     for i in xrange(start, end)])
+
+        # records are kept only as long as they are used
+        del self._line_top.children_lines()[:]
+        self._current_line = self._line_top
+
+        return record
+
+    def _parse_line(self,number,line):
+        (l,p,t,v) = _tokenize(number,line)
+        return self._add_line(number,l,p,t,v)
+
+    def _add_line(self,number,l,p,t,v):
         # create the line
         if l > self._current_level + 1:
-            self._error(number,"Structure of GEDCOM file is corrupted")
+            _error(number,"Structure of GEDCOM file is corrupted")
+
+        # lines share a single copy of each tag and xref
+        t = self._strings.setdefault(t,t)
+        if p != '':
+            p = self._strings.setdefault(p,p)
+        if v[:1] == '@' and v[-1:] == '@':
+            v = self._strings.setdefault(v,v)
 
         if l == 0: #current line is in fact a brand new record
-            if t == "INDI":
-                e = Individual(l,p,t,v,self.record_dict())
-                self._individual_list.append(e)
-            elif t == "FAM":
-                e = Family(l,p,t,v,self.record_dict())
-                self._family_list.append(e)
-            elif t == "OBJE":
-                e = Multimedia(l,p,t,v,self.record_dict())
-            elif t == "NOTE":
-                e = Note(l,p,t,v,self.record_dict())
-            elif t == "REPO":
-                e = Repository(l,p,t,v,self.record_dict())
-            elif t == "SOUR":
-                e = Source(l,p,t,v,self.record_dict())
-            elif t == "SUBN":
-                e = Submission(l,p,t,v,self.record_dict())
-            elif t == "SUBM":
-                e = Submitter(l,p,t,v,self.record_dict())
-            else:
-                e = Record(l,p,t,v,self.record_dict())
+            e = _RECORD_CLASSES.get(t,Record)(l,p,t,v,self._record_dict)
         else:
-            e = Line(l,p,t,v,self.record_dict())
-
-        self._line_list.append(e)
-        if p != '':
-            self._record_dict[p] = e
+            e = Line(l,p,t,v,self._record_dict)
 
         if l > self._current_level:
             self._current_line.add_child(e)
@@ -192,51 +601,484 @@ class Gedcom:
         # finish up
         self._current_level = l
         self._current_line = e
+        self._store_line(e)
 
-    def _level(self,number,head):
-        try:
-            l = int(head)
-        except ValueError:
-            self._error(number,"Line must start with an integer level")
+        return e
 
-        if (l < 0):
-            self._error(number,"Line must start with a positive integer")
+    def _add_columns(self,columns):
+        """ Create Line objects of all lines of a column store, which
+        were already checked when they were added to it """
+        strings = self._strings
+        tags = [strings.setdefault(t,t) for t in columns.tags]
+        # xref id -1 (no xref) is the last one
+        xrefs = [strings.setdefault(p,p) for p in columns.xrefs] + [u'']
+        (levels, parents, tag_ids, xref_ids) = (columns.levels, columns.parents,
+                                                columns.tag_ids, columns.xref_ids)
+        offsets = columns.value_offsets
 
-        return l
+        # if all values are ASCII, they are decoded at once, and byte
+        # offsets are also offsets of characters
+        values = columns.values
+        text = values.decode("utf-8")
+        if len(text) == len(values):
+            values = text
 
-    def _xref(self,number,head):
-        if head == '':
-            self._error(number,"Incomplete Line")
-        p = ''
-        if head[0] == '@':
-            if head[len(head)-1] == '@':
-                p = head
-                # could strip the xref to remove the @ with
-                # string.strip(head,'@')
-                # but it may be useful to identify xrefs outside this class
+        lines = []
+        for i in xrange(len(levels)):
+            (l, p, t) = (levels[i], xrefs[xref_ids[i]], tags[tag_ids[i]])
+            v = values[offsets[i]:offsets[i + 1]]
+            if values is not text:
+                v = v.decode("utf-8")
+            if v[:1] == '@' and v[-1:] == '@':
+                v = strings.setdefault(v,v)
+
+            if l == 0:
+                e = _RECORD_CLASSES.get(t,Record)(l,p,t,v,self._record_dict)
+                parent = self._line_top
+                if t == "INDI":
+                    self._individual_list.append(e)
+                elif t == "FAM":
+                    self._family_list.append(e)
             else:
-                self._error(number,"Xref must start and end with @")
-        return p
+                e = Line(l,p,t,v,self._record_dict)
+                parent = lines[parents[i]]
+            parent.add_child(e)
+            e.add_parent_line(parent)
+            if p != '':
+                self._record_dict[p] = e
+            lines.append(e)
+
+        # lines are stored as by _store_line()
+        self._line_list.extend(lines)
+        if lines != []:
+            self._current_level = lines[-1].level()
+            self._current_line = lines[-1]
+
+        for e in lines:
+            e._init()
 
-    def _tag(self,number,head):
-        if head == '':
-            self._error(number,"Incomplete Line")
-        return head
+    def _store_line(self,e):
+        if self._lazy():
+            # lazily parsed records are kept by the record index
+            return
 
-    def _error(self,number,text):
-        error = "Gedcom format error on line " + unicode(number) + ': ' + text
-        raise GedcomParseError(error)
+        self._line_list.append(e)
+        if e.xref() != '':
+            self._record_dict[e.xref()] = e
+
+        if e.level() == 0:
+            if e.tag() == "INDI":
+                self._individual_list.append(e)
+            elif e.tag() == "FAM":
+                self._family_list.append(e)
 
     def _print(self):
         for e in self.line_list:
             print string.join([unicode(e.level()),e.xref(),e.tag(),e.value()])
 
 
+# Tokenizer
+
+def _select(lines,number,record_types,tags):
+    """ Yield pairs (number, line) of (undecoded) lines which are to
+    be parsed, skipping records and subtrees which are not selected
+    by record_types and tags. """
+    if record_types is None and tags is None:
+        for line in lines:
+            yield (number, line)
+            number += 1
+        return
+
+    skip = None # lines deeper than this level are skipped
+    for line in lines:
+        try:
+            head = line.split(None, 3)
+            if number == 1 and head[0].startswith(codecs.BOM_UTF8):
+                head[0] = head[0][len(codecs.BOM_UTF8):]
+            level = int(head[0])
+            if skip is not None and level > skip:
+                number += 1
+                continue
+            skip = None
+
+            if level <= 1:
+                if head[1].startswith('@'):
+                    tag = head[2]
+                else:
+                    tag = head[1]
+                if level == 0:
+                    selected = record_types
+                else:
+                    selected = tags
+                if selected is not None and tag not in selected:
+                    skip = level
+                    number += 1
+                    continue
+        except (IndexError, ValueError):
+            # leave reporting of the error to the tokenizer
+            pass
+
+        yield (number, line)
+        number += 1
+
+def _tokenize(number,line):
+    """ Return a tuple (level, xref, tag, value) of a line """
+    tail = line.strip()
+
+    match = _LINE.match(tail)
+    if match is None:
+        # find out what is wrong with the line
+        return _tokenize_checked(number,line)
+
+    (l, p, t, notag, v) = match.groups()
+    if p is None:
+        p = ''
+        t = notag
+    if v is None:
+        v = ''
+
+    return (int(l),p,t,v)
+
+def _tokenize_checked(number,line):
+    # each line should have: Level SP (Xref SP)? Tag (SP Value)? (SP)? NL
+    # parse the line
+    tail = line.strip()
+
+    if tail == '':
+        _error(number,"Empty line")
+
+    try:
+        [head, tail] = tail.split(' ', 1)
+    except ValueError:
+        _error(number,"Incomplete line")
+
+    l = _level(number,head) #retireve line level
+
+    try:
+        [head, tail] = tail.split(' ', 1)
+    except ValueError:
+        [head, tail] = [tail, '']
+    p = _xref(number,head) #retrieve line xref if it exists
+    if p != '':
+        try:
+            [head, tail] = tail.split(' ', 1)
+        except ValueError:
+            [head, tail] = [tail, '']
+    t = _tag(number,head) #retrieve line tag
+
+    v = tail #retrieve value of tag if it exists
+
+    return (l,p,t,v)
+
+def _level(number,head):
+    try:
+        l = int(head)
+    except ValueError:
+        _error(number,"Line must start with an integer level")
+
+    if (l < 0):
+        _error(number,"Line must start with a positive integer")
+
+    return l
+
+def _xref(number,head):
+    if head == '':
+        _error(number,"Incomplete Line")
+    p = ''
+    if head[0] == '@':
+        if head[len(head)-1] == '@':
+            p = head
+            # could strip the xref to remove the @ with
+            # string.strip(head,'@')
+            # but it may be useful to identify xrefs outside this class
+        else:
+            _error(number,"Xref must start and end with @")
+    return p
+
+def _tag(number,head):
+    if head == '':
+        _error(number,"Incomplete Line")
+    return head
+
+def _error(number,text):
+    error = "Gedcom format error on line " + unicode(number) + ': ' + text
+    raise GedcomParseError(error)
+
+
+def _file_digest(file):
+    """ Return MD5 hash of the content of file """
+    md5 = hashlib.md5()
+    f = open(file, 'rb')
+    try:
+        for chunk in iter(lambda: f.read(1 << 20), ''):
+            md5.update(chunk)
+    finally:
+        f.close()
+    return md5.hexdigest()
+
+
+def _find_record(mm, pos):
+    """ Return the offset of the first record which starts after pos
+    in the memory-mapped file mm, or -1 if there is none """
+    match = _RECORD_START.search(mm, pos)
+    if match is None:
+        return -1
+    return match.start() + 1
+
+
+class _RecordIndex(DictMixin):
+    """ Record dictionary of a lazily parsed Gedcom file
+
+    Knows the byte offset of every record in the file, and parses
+    each record the first time it is accessed.
+    """
+
+    def __init__(self,gedcom):
+        self._gedcom = gedcom
+        self._offsets = array('L')
+        self._tags = []
+        self._records = {}
+        self._positions = {}
+
+    def add(self,offset,xref,tag):
+        """ Add a record with given xref and tag starting at offset """
+        if xref != '':
+            self._positions[xref] = len(self._offsets)
+        self._offsets.append(offset)
+        self._tags.append(intern(tag.encode("utf-8")))
+
+    def record(self,n):
+        """ Return n-th record of the file, parsing it if needed """
+        try:
+            return self._records[n]
+        except KeyError:
+            record = self._parse(n)
+            self._records[n] = record
+            return record
+
+    def records(self,tag=None):
+        """ Return a list of all records (or all records with given tag) """
+        return [self.record(n) for n in self._numbers(tag)]
+
+    def lines(self):
+        """ Return a list of all lines """
+        lines = []
+        for record in self.records():
+            self._gedcom._collect_lines(record, lines)
+        return lines
+
+    def _numbers(self,tag):
+        """ Return numbers of all records (or all records with given tag) """
+        return [n for n in xrange(len(self._offsets))
+                if tag is None or self._tags[n] == tag]
+
+    def _end(self,n):
+        if n + 1 < len(self._offsets):
+            return self._offsets[n + 1]
+        return len(self._gedcom._mmap)
+
+    def _parse(self,n):
+        return self._gedcom._parse_record(self._offsets[n], self._end(n))
+
+    def __getitem__(self,xref):
+        return self.record(self._positions[xref])
+
+    def keys(self):
+        return self._positions.keys()
+
+    def __contains__(self,xref):
+        return xref in self._positions
+
+    def __iter__(self):
+        return iter(self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+
+class _ColumnIndex(_RecordIndex):
+    """ Record dictionary of a Gedcom file stored in columns
+
+    Knows the number of the first line of every record, and creates
+    Line objects of a record when it is accessed.  Records are kept
+    only as long as they are referenced from outside of the index.
+    """
+
+    def __init__(self,gedcom):
+        _RecordIndex.__init__(self,gedcom)
+        self.columns = LineColumns()
+        self._records = weakref.WeakValueDictionary()
+
+    def add_records(self):
+        """ Add all records of the column store """
+        columns = self.columns
+        levels = columns.levels
+        for i in xrange(len(levels)):
+            if levels[i] == 0:
+                self.add(i, columns.xref(i), columns.tag(i))
+
+    def records(self,tag=None):
+        return _RecordList(self, self._numbers(tag))
+
+    def lines(self):
+        return _LineList(self)
+
+    def _end(self,n):
+        if n + 1 < len(self._offsets):
+            return self._offsets[n + 1]
+        return len(self.columns)
+
+    def _parse(self,n):
+        return self._gedcom._load_columns(self._offsets[n], self._end(n))
+
+
+class _RecordList(Sequence):
+    """ List of records of a Gedcom file stored in columns, which
+    creates records as they are accessed """
+
+    def __init__(self,index,numbers):
+        self._index = index
+        self._numbers = array('L', numbers)
+
+    def __getitem__(self,i):
+        if isinstance(i, slice):
+            return [self._index.record(n) for n in self._numbers[i]]
+        return self._index.record(self._numbers[i])
+
+    def __len__(self):
+        return len(self._numbers)
+
+
+class _LineList(Sequence):
+    """ List of lines of a Gedcom file stored in columns, which
+    creates records as they are accessed """
+
+    def __init__(self,index):
+        self._index = index
+
+    def __getitem__(self,i):
+        if isinstance(i, slice):
+            return [self[j] for j in xrange(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0 or i >= len(self):
+            raise IndexError("line index out of range")
+
+        n = bisect_right(self._index._offsets, i) - 1
+        lines = []
+        self._index._gedcom._collect_lines(self._index.record(n), lines)
+        return lines[i - self._index._offsets[n]]
+
+    def __iter__(self):
+        for n in xrange(len(self._index._offsets)):
+            lines = []
+            self._index._gedcom._collect_lines(self._index.record(n), lines)
+            for line in lines:
+                yield line
+
+    def __len__(self):
+        return len(self._index.columns)
+
+
+class _RecordStream(Gedcom):
+    """ Gedcom parser which holds only one record in memory at a time
+
+    Used by iter_records().
+    """
+
+    def _parse(self,file):
+        # file is parsed by records()
+        pass
+
+    def records(self):
+        """ Yield records of the file one by one """
+        for record in self._parse_records(self._file):
+            lines = []
+            self._collect_lines(record, lines)
+            for e in lines:
+                e._init()
+            yield record
+
+    def _store_line(self,e):
+        if e.level() == 0:
+            # forget records which were already handed out, and strings
+            # shared by their lines, so that memory doesn't grow with
+            # the size of the file
+            del self._line_top.children_lines()[:-1]
+            self._strings.clear()
+
+
+def _parse_chunk(chunk):
+    """ Return a LineColumns with lines of a part of a Gedcom file.
+    Run by worker processes of a parallel Gedcom parser. """
+    (file, start, end, number, record_types, tags) = chunk
+    f = open(file, 'rb')
+    try:
+        f.seek(start)
+        lines = f.read(end - start).split('\n')
+    finally:
+        f.close()
+
+    if lines[-1] == '':
+        lines.pop()
+
+    columns = LineColumns()
+    _fill_columns(columns,lines,number,record_types,tags)
+    columns.finish()
+    return columns
+
+
+def _fill_columns(columns,lines,number,record_types,tags):
+    """ Tokenize selected lines (see _select()) and append them to
+    columns """
+    level = -1
+    for (number, line) in _select(lines,number,record_types,tags):
+        (l,p,t,v) = _tokenize(number,line.decode("utf-8-sig"))
+        if l > level + 1:
+            _error(number,"Structure of GEDCOM file is corrupted")
+        columns.append(l,p,t,v)
+        level = l
+
+
+def _is_snapshot_header(header):
+    """ Check if header was read from a snapshot saved in the current
+    format """
+    return isinstance(header, tuple) and len(header) == 7 and header[0] == _SNAPSHOT_FORMAT
+
+def _optional_set(items):
+    if items is None:
+        return None
+    return set(items)
+
+
+def _sorted_or_none(items):
+    if items is None:
+        return None
+    return sorted(items)
+
+
+def iter_records(file):
+    """ Iterate over records of a Gedcom file
+
+    Unlike Gedcom, which keeps every line of the file in memory, this
+    generator reads the file incrementally and yields each record
+    (Record object or one of its subclasses, together with its child
+    lines) as soon as all of its lines are read, so that files of any
+    size can be processed in constant memory.
+
+    Records returned by this generator are not linked to each other:
+    cross-references are not resolved, so e.g. Individual.families()
+    always returns an empty list.
+    """
+    return _RecordStream(file).records()
+
+
 class GedcomParseError(Exception):
     """ Exception raised when a Gedcom parsing error occurs
     """
     
     def __init__(self, value):
+        Exception.__init__(self, value)
         self.value = value
         
     def __str__(self):
@@ -0,0 +1,526 @@
+#-*- coding: utf-8 -*-
+#
+# Gedcom 5.5 Parser
+#
+# Copyright (C) 2010 Nikola Škorić (nskoric [ at ] gmail.com)
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# Please see the GPL license at http://www.gnu.org/licenses/gpl.txt
+#
+# To contact the author, see http://github.com/dijxtra/simplepyged
+
+
+# Global imports
+import heapq
+import random
+from array import array
+
+class FamilyGraph:
+    """ Graph of individuals and families of a Gedcom file
+
+    Every individual and every family gets a dense integer id (their
+    position in individual_list() and family_list() of the Gedcom
+    file), and edges between them are stored in compressed arrays: for
+    each kind of edge, targets of all ids are stored one after another
+    in one array, and another array holds the offset at which targets
+    of each id start.  This makes traversing the family tree a matter
+    of indexing arrays, instead of calling methods of records.
+
+    Edges are the same as those followed by methods of Individual and
+    Family: parents() and children() of an individual, its spouses
+    (other members of its families()), its families() and
+    parent_families(), and husband(), wife() and children() of a
+    family.
+
+    The graph reflects the Gedcom file at the time it was built.
+    """
+
+    def __init__(self, gedcom):
+        # in a Gedcom file stored in columns, these create records as
+        # they are accessed, and records aren't kept by the graph
+        self._individuals = gedcom.individual_list()
+        self._families = gedcom.family_list()
+        self._ids = dict((e.xref(), i) for (i, e) in enumerate(self._individuals))
+        self._family_ids = dict((e.xref(), i) for (i, e) in enumerate(self._families))
+
+        self.husbands = array('i')
+        self.wives = array('i')
+        family_children = []
+        for f in self._families:
+            self.husbands.append(self._first_id(f, "HUSB"))
+            self.wives.append(self._first_id(f, "WIFE"))
+            family_children.append(self._ids_of(f, "CHIL", self._ids))
+        (self.family_child_offsets, self.family_children) = _compress(family_children)
+
+        families = []
+        parent_families = []
+        for e in self._individuals:
+            families.append(self._ids_of(e, "FAMS", self._family_ids))
+            parent_families.append(self._ids_of(e, "FAMC", self._family_ids))
+        (self.family_offsets, self.families) = _compress(families)
+        (self.parent_family_offsets, self.parent_families) = _compress(parent_families)
+
+        parents = []
+        children = []
+        spouses = []
+        for i in xrange(len(self._individuals)):
+            parents.append([p for f in parent_families[i]
+                            for p in (self.husbands[f], self.wives[f]) if p >= 0])
+            children.append([c for f in families[i] for c in family_children[f]])
+            spouses.append([p for f in families[i]
+                            for p in (self.husbands[f], self.wives[f]) if p >= 0 and p != i])
+        (self.parent_offsets, self.parents) = _compress(parents)
+        (self.child_offsets, self.children) = _compress(children)
+        (self.spouse_offsets, self.spouses) = _compress(spouses)
+
+        self._components = None
+        self._component_sizes = None
+        self._order = None
+        self._generations = None
+
+    def __len__(self):
+        """ Return the number of individuals """
+        return len(self._individuals)
+
+    def id(self, individual):
+        """ Return the id of an individual """
+        return self._ids[individual.xref()]
+
+    def family_id(self, family):
+        """ Return the id of a family """
+        return self._family_ids[family.xref()]
+
+    def individual(self, i):
+        """ Return the individual with id i """
+        return self._individuals[i]
+
+    def family(self, f):
+        """ Return the family with id f """
+        return self._families[f]
+
+    def family_count(self):
+        """ Return the number of families """
+        return len(self._families)
+
+    def parents_of(self, i):
+        """ Return ids of parents of individual i """
+        return self.parents[self.parent_offsets[i]:self.parent_offsets[i + 1]]
+
+    def children_of(self, i):
+        """ Return ids of children of individual i """
+        return self.children[self.child_offsets[i]:self.child_offsets[i + 1]]
+
+    def spouses_of(self, i):
+        """ Return ids of spouses of individual i """
+        return self.spouses[self.spouse_offsets[i]:self.spouse_offsets[i + 1]]
+
+    def families_of(self, i):
+        """ Return ids of families in which individual i is a spouse """
+        return self.families[self.family_offsets[i]:self.family_offsets[i + 1]]
+
+    def parent_families_of(self, i):
+        """ Return ids of families in which individual i is a child """
+        return self.parent_families[self.parent_family_offsets[i]:self.parent_family_offsets[i + 1]]
+
+    def family_children_of(self, f):
+        """ Return ids of children of family f """
+        return self.family_children[self.family_child_offsets[f]:self.family_child_offsets[f + 1]]
+
+    def ancestors(self, i):
+        """ Return a dictionary which maps ids of individual i and all
+        of its ancestors to their distances from i in number of
+        generations """
+        return self._distances(i, self.parent_offsets, self.parents)
+
+    def descendants(self, i):
+        """ Return a dictionary which maps ids of individual i and all
+        of its descendants to their distances from i in number of
+        generations """
+        return self._distances(i, self.child_offsets, self.children)
+
+    def relationships(self, i):
+        """ Find relationships of individual i to all of its relatives
+        (as in Individual.relationships(), but without paths)
+
+        Returns a dictionary which maps id of each relative (and of i
+        itself) to a tuple (common ancestor, up, down) of ids of the
+        common ancestor, and distances from i up to the common ancestor
+        and from it down to the relative.
+        """
+        parent_offsets = self.parent_offsets
+        parents = self.parents
+        child_offsets = self.child_offsets
+        children = self.children
+
+        # queues[n] holds tuples (down, individual, common ancestor) of
+        # individuals n steps away from i
+        queues = []
+        for (a, up) in self.ancestors(i).iteritems():
+            while len(queues) <= up:
+                queues.append([])
+            queues[up].append((0, a, a))
+
+        found = {}
+        n = 0
+        while n < len(queues):
+            # prefer a direct line when paths are equally long
+            queues[n].sort(key=lambda (down, j, a): min(n - down, down))
+            for (down, j, a) in queues[n]:
+                if j in found:
+                    continue
+                found[j] = (a, n - down, down)
+                if child_offsets[j] != child_offsets[j + 1]:
+                    if n + 1 == len(queues):
+                        queues.append([])
+                    queue = queues[n + 1]
+                    for c in children[child_offsets[j]:child_offsets[j + 1]]:
+                        if c not in found:
+                            queue.append((down + 1, c, a))
+            queues[n] = None
+            n += 1
+
+        return found
+
+    def topological_order(self):
+        """ Return an array of ids of all individuals, ordered so that
+        parents always come before their children.
+
+        Raises CycleError if some individuals are their own ancestors
+        (which can only happen in a broken file).
+        """
+        if self._order is None:
+            self._order = self._targets_first(self.parent_offsets, self.parents)
+
+        return self._order
+
+    def generations(self):
+        """ Return an array of generation numbers of all individuals,
+        indexed by id.  Individuals without known parents are in
+        generation 0, and every other individual is one generation
+        after its latest parent.
+
+        Raises CycleError if some individuals are their own ancestors.
+        """
+        if self._generations is not None:
+            return self._generations
+
+        generations = array('i', [0]) * len(self._individuals)
+        for i in self.topological_order():
+            for p in self.parents_of(i):
+                if generations[p] >= generations[i]:
+                    generations[i] = generations[p] + 1
+
+        self._generations = generations
+        return generations
+
+    def generations_from(self, i):
+        """ Return a dictionary which maps ids of individual i and all
+        of its relatives to their generation relative to i: 1 for
+        parents, 2 for grandparents, -1 for children, 0 for siblings
+        and cousins, 1 for aunts and uncles, and so on.
+        """
+        return dict((j, up - down) for (j, (a, up, down)) in self.relationships(i).iteritems())
+
+    def ancestor_counts(self, k = None):
+        """ Return an array of numbers of ancestors of all individuals,
+        indexed by id.
+
+        Counts are computed for all individuals together, in one pass
+        over them in topological order, and ancestors reachable through
+        more than one line are counted only once.  Sets of ancestors
+        are kept exactly, unless k is given.  Exact sets are kept as
+        lists of intervals of ids given in depth-first order (in which
+        ancestors of an individual mostly have consecutive ids, as in
+        AncestryIndex), and each set is dropped once all children of
+        its individual are counted.  If k is given, only a sketch of k
+        values is kept for each set, and counts of sets larger than k
+        are estimates, with relative standard error of about
+        1/sqrt(k - 2).  This is faster for very large trees with a lot
+        of pedigree collapse, where exact sets stay long even as
+        intervals.  Counts of sets smaller than k are still exact.
+
+        Raises CycleError if some individuals are their own ancestors.
+        """
+        order = self.topological_order()
+        return self._counts(order, self.parent_offsets, self.parents, k)
+
+    def descendant_counts(self, k = None):
+        """ Return an array of numbers of descendants of all
+        individuals, indexed by id (see ancestor_counts()). """
+        # children_of() may differ from parents in an inconsistent
+        # file, so individuals are ordered by their children
+        order = self._targets_first(self.child_offsets, self.children)
+        return self._counts(order, self.child_offsets, self.children, k)
+
+    def component(self, i):
+        """ Return the id of the connected component of individual i.
+
+        Two individuals are in the same component if they are connected
+        through any chain of families, as husbands, wives or children
+        (i.e. through blood or marriage).  Components are numbered
+        from 0, in order of their first individual.
+        """
+        return self._labels()[i]
+
+    def connected(self, i, j):
+        """ Determine if individuals i and j are in the same connected
+        component """
+        labels = self._labels()
+        return labels[i] == labels[j]
+
+    def component_sizes(self):
+        """ Return a list of numbers of individuals in each connected
+        component, indexed by component id """
+        self._labels()
+        return list(self._component_sizes)
+
+    # Private methods
+
+    def _counts(self, order, offsets, targets, k):
+        """ Return numbers of individuals reachable from each individual
+        through edges given by offsets and targets, visiting
+        individuals in order in which all targets of an individual come
+        before it """
+        counts = array('i', [0]) * len(self._individuals)
+        if k is None:
+            # sets are lists of intervals of ids, and are counted in
+            # the order in which ids were given
+            (ids, numbered) = self._depth_first(order, offsets, targets)
+            sources = array('i', [0]) * len(self._individuals)
+            for j in targets:
+                sources[j] += 1
+            sets = {}
+            for i in numbered:
+                intervals = [(ids[i], ids[i])]
+                for j in targets[offsets[i]:offsets[i + 1]]:
+                    intervals.extend(sets[j])
+                    sources[j] -= 1
+                    if sources[j] == 0:
+                        del sets[j]
+                intervals = _union(intervals)
+                counts[i] = sum([end - start for (start, end) in intervals]) + len(intervals) - 1
+                if sources[i] > 0:
+                    sets[i] = intervals
+            return counts
+
+        # k minimum values sketch: every individual is given a random
+        # value between 0 and 1, and a set is represented by k smallest
+        # values of its members
+        rng = random.Random(0)
+        values = [rng.random() for i in xrange(len(self._individuals))]
+        sketches = [()] * len(self._individuals)
+        for i in order:
+            members = set()
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                members.update(sketches[j])
+                members.add(values[j])
+            if len(members) > k:
+                sketch = tuple(heapq.nsmallest(k, members))
+            else:
+                sketch = tuple(sorted(members))
+            sketches[i] = sketch
+            if len(sketch) < k:
+                counts[i] = len(sketch)
+            else:
+                counts[i] = int(round((k - 1) / sketch[-1]))
+        return counts
+
+    def _depth_first(self, order, offsets, targets):
+        """ Return a tuple (ids, numbered), where ids is an array of
+        new ids of all individuals and numbered is an array of
+        individuals ordered by new ids.  Ids are given in depth-first
+        order through edges given by offsets and targets, starting
+        from individuals at the end of order (which has to have all
+        targets of an individual before it), so that all targets of an
+        individual get smaller ids. """
+        ids = array('i', [-1]) * len(self._individuals)
+        numbered = array('i')
+        for start in reversed(order):
+            if ids[start] != -1:
+                continue
+            # -2 marks individuals being searched
+            ids[start] = -2
+            stack = [(start, iter(targets[offsets[start]:offsets[start + 1]]))]
+            while stack != []:
+                (i, rest) = stack[-1]
+                for j in rest:
+                    if ids[j] == -1:
+                        ids[j] = -2
+                        stack.append((j, iter(targets[offsets[j]:offsets[j + 1]])))
+                        break
+                else:
+                    stack.pop()
+                    ids[i] = len(numbered)
+                    numbered.append(i)
+
+        return (ids, numbered)
+
+    def _targets_first(self, offsets, targets):
+        """ Return an array of ids of all individuals, ordered so that
+        all targets of edges given by offsets and targets come before
+        individuals which point to them.  Raises CycleError if edges
+        form a cycle. """
+        sources = [[] for i in xrange(len(self._individuals))]
+        # number of targets not yet in order
+        waiting = array('i', [0]) * len(self._individuals)
+        for i in xrange(len(self._individuals)):
+            for j in targets[offsets[i]:offsets[i + 1]]:
+                sources[j].append(i)
+                waiting[i] += 1
+
+        order = array('i', [i for i in xrange(len(self._individuals)) if waiting[i] == 0])
+        n = 0
+        while n < len(order):
+            for i in sources[order[n]]:
+                waiting[i] -= 1
+                if waiting[i] == 0:
+                    order.append(i)
+            n += 1
+
+        if len(order) < len(self._individuals):
+            # every individual left out has a target which was left
+            # out too, so following such targets has to lead into a
+            # cycle
+            i = [j for j in xrange(len(self._individuals)) if waiting[j] > 0][0]
+            seen = {}
+            path = []
+            while i not in seen:
+                seen[i] = len(path)
+                path.append(i)
+                i = [j for j in targets[offsets[i]:offsets[i + 1]] if waiting[j] > 0][0]
+            cycle = [self._individuals[j] for j in path[seen[i]:]]
+            if targets is self.children:
+                cycle.reverse()
+            raise CycleError(cycle)
+
+        return order
+
+    def _labels(self):
+        """ Return an array of component ids of all individuals,
+        labelling them on first use """
+        if self._components is not None:
+            return self._components
+
+        # union-find over members of all families
+        roots = array('i', xrange(len(self._individuals)))
+        sizes = array('i', [1]) * len(self._individuals)
+
+        def find(i):
+            while roots[i] != i:
+                roots[i] = roots[roots[i]]
+                i = roots[i]
+            return i
+
+        for f in xrange(len(self._families)):
+            members = [p for p in (self.husbands[f], self.wives[f]) if p >= 0]
+            members.extend(self.family_children_of(f))
+            if members == []:
+                continue
+            a = find(members[0])
+            for m in members[1:]:
+                b = find(m)
+                if a == b:
+                    continue
+                if sizes[a] < sizes[b]:
+                    (a, b) = (b, a)
+                roots[b] = a
+                sizes[a] += sizes[b]
+
+        labels = array('i', [-1]) * len(self._individuals)
+        component_sizes = []
+        for i in xrange(len(self._individuals)):
+            root = find(i)
+            if labels[root] < 0:
+                labels[root] = len(component_sizes)
+                component_sizes.append(sizes[root])
+            labels[i] = labels[root]
+
+        self._components = labels
+        self._component_sizes = component_sizes
+        return labels
+
+    def _first_id(self, record, tag):
+        ids = self._ids_of(record, tag, self._ids)
+        if ids == []:
+            return -1
+        return ids[0]
+
+    @staticmethod
+    def _ids_of(record, tag, ids):
+        """ Return ids of records to which child lines of record with
+        given tag point, skipping pointers to missing records """
+        return [ids[e.value()] for e in record.children_tags(tag) if e.value() in ids]
+
+    @staticmethod
+    def _distances(i, offsets, targets):
+        distances = {i: 0}
+        generation = [i]
+        distance = 0
+        while generation != []:
+            distance += 1
+            new = []
+            for j in generation:
+                for k in targets[offsets[j]:offsets[j + 1]]:
+                    if k not in distances:
+                        distances[k] = distance
+                        new.append(k)
+            generation = new
+
+        return distances
+
+class CycleError(Exception):
+    """ Exception raised when individuals are found to be their own
+    ancestors
+
+    Attribute individuals is a list of individuals in the cycle, each
+    of them a child of the next one (and the last one a child of the
+    first one).
+    """
+
+    def __init__(self, individuals):
+        value = "Individuals are their own ancestors: " + ", ".join([e.xref() for e in individuals])
+        Exception.__init__(self, value)
+        self.value = value
+        self.individuals = individuals
+
+    def __str__(self):
+        return self.value
+
+def _union(intervals):
+    """ Return a sorted list of disjoint intervals which cover the
+    same ids as given intervals (start, end) """
+    intervals.sort()
+    union = []
+    (start, end) = intervals[0]
+    for (s, e) in intervals:
+        if s > end + 1:
+            union.append((start, end))
+            start = s
+        if e > end:
+            end = e
+    union.append((start, end))
+    return union
+
+def _compress(lists):
+    """ Return a tuple (offsets, targets) of arrays, where targets are
+    members of all lists one after another, and members of i-th list
+    start at offsets[i] """
+    offsets = array('i', [0])
+    targets = array('i')
+    for l in lists:
+        targets.extend(l)
+        offsets.append(len(targets))
+    return (offsets, targets)
@@ -0,0 +1,190 @@
+#-*- coding: utf-8 -*-
+#
+# Gedcom 5.5 Parser
+#
+# Copyright (C) 2010 Nikola Škorić (nskoric [ at ] gmail.com)
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# Please see the GPL license at http://www.gnu.org/licenses/gpl.txt
+#
+# To contact the author, see http://github.com/dijxtra/simplepyged
+
+
+# Global imports
+from array import array
+
+class Kinship:
+    """ Kinship and inbreeding coefficients of individuals in a Gedcom
+    file
+
+    The kinship coefficient of two individuals is the probability that
+    alleles picked at random from each of them at the same locus are
+    identical by descent.  It is computed with the recursive (tabular)
+    method: kinship of an individual with someone who isn't its
+    descendant is the mean of kinships of its father and mother with
+    that someone, and kinship of an individual with itself is
+    (1 + kinship of its father and mother) / 2.  Individuals are
+    expanded in generation order (descendants before their ancestors),
+    and every computed coefficient is remembered, so ancestors shared
+    through pedigree collapse are accounted for correctly, and each
+    pair of individuals is computed only once.
+
+    Father and mother of an individual are husband and wife of its
+    first family in parent_families() (see Individual.parents()).
+    Unknown parents are treated as unrelated founders.
+    """
+
+    def __init__(self, gedcom):
+        self._graph = gedcom.graph()
+        n = len(self._graph)
+        self._fathers = array('i', [-1]) * n
+        self._mothers = array('i', [-1]) * n
+        for i in xrange(n):
+            families = self._graph.parent_families_of(i)
+            if len(families) > 0:
+                self._fathers[i] = self._graph.husbands[families[0]]
+                self._mothers[i] = self._graph.wives[families[0]]
+        self._depths = self._generation_depths()
+        self._kinships = {}
+
+    def kinship(self, individual, relative):
+        """ Return the kinship coefficient of individual and relative """
+        return self._kinship(self._graph.id(individual), self._graph.id(relative))
+
+    def inbreeding(self, individual):
+        """ Return the inbreeding coefficient of individual (the kinship
+        coefficient of its father and mother) """
+        i = self._graph.id(individual)
+        return self._parents_kinship(i)
+
+    def relationship(self, individual, relative):
+        """ Return the coefficient of relationship of individual and
+        relative (e.g. 0.5 for parent and child or for siblings, 0.25
+        for grandparent and grandchild, and 0.125 for first cousins,
+        if there is no inbreeding) """
+        i = self._graph.id(individual)
+        j = self._graph.id(relative)
+        denominator = ((1 + self._parents_kinship(i)) * (1 + self._parents_kinship(j))) ** 0.5
+        return 2 * self._kinship(i, j) / denominator
+
+    def matrix(self, individuals):
+        """ Return a matrix (list of lists) of kinship coefficients of
+        all pairs of given individuals """
+        ids = [self._graph.id(e) for e in individuals]
+        rows = []
+        for (n, i) in enumerate(ids):
+            row = []
+            for (m, j) in enumerate(ids):
+                if m < n:
+                    row.append(rows[m][n])
+                else:
+                    row.append(self._kinship(i, j))
+            rows.append(row)
+        return rows
+
+    # Private methods
+
+    def _parents_kinship(self, i):
+        if self._fathers[i] < 0 or self._mothers[i] < 0:
+            return 0.0
+        return self._kinship(self._fathers[i], self._mothers[i])
+
+    def _kinship(self, i, j):
+        """ Return kinship coefficient of individuals with ids i and j """
+        # coefficients are remembered under key i * n + j, where i <= j
+        n = len(self._graph)
+        kinships = self._kinships
+        fathers = self._fathers
+        mothers = self._mothers
+        depths = self._depths
+
+        stack = [(i, j)]
+        while stack != []:
+            (i, j) = stack[-1]
+            if i > j:
+                (i, j) = (j, i)
+            key = i * n + j
+            if key in kinships:
+                stack.pop()
+                continue
+
+            if i == j:
+                (a, b) = (fathers[i], mothers[i])
+                if a > b:
+                    (a, b) = (b, a)
+                if a < 0:
+                    kinships[key] = 0.5
+                elif a * n + b in kinships:
+                    kinships[key] = (1 + kinships[a * n + b]) / 2
+                else:
+                    stack.append((a, b))
+                    continue
+                stack.pop()
+                continue
+
+            # expand the one which can't be an ancestor of the other
+            if depths[i] > depths[j]:
+                (i, j) = (j, i)
+            values = []
+            for a in (fathers[j], mothers[j]):
+                if a < 0:
+                    values.append(0.0)
+                elif a <= i and a * n + i in kinships:
+                    values.append(kinships[a * n + i])
+                elif a > i and i * n + a in kinships:
+                    values.append(kinships[i * n + a])
+                else:
+                    stack.append((a, i))
+            if len(values) == 2:
+                kinships[key] = (values[0] + values[1]) / 2
+                stack.pop()
+
+        if i > j:
+            (i, j) = (j, i)
+        return kinships[i * n + j]
+
+    def _generation_depths(self):
+        """ Return an array with length of the longest line of
+        ancestors of every individual.  Links which would make an
+        individual its own ancestor (which can only happen in a broken
+        file) are removed. """
+        n = len(self._graph)
+        depths = array('i', [-1]) * n
+        parents = [self._fathers, self._mothers]
+        for start in xrange(n):
+            if depths[start] >= 0:
+                continue
+            in_progress = set([start])
+            stack = [start]
+            while stack != []:
+                i = stack[-1]
+                pending = False
+                for p in parents:
+                    if p[i] < 0 or depths[p[i]] >= 0:
+                        continue
+                    if p[i] in in_progress:
+                        p[i] = -1
+                        continue
+                    in_progress.add(p[i])
+                    stack.append(p[i])
+                    pending = True
+                    break
+                if pending:
+                    continue
+                stack.pop()
+                in_progress.remove(i)
+                depths[i] = 1 + max([depths[p[i]] for p in parents if p[i] >= 0] + [-1])
+        return depths
@@ -24,7 +24,16 @@
 #
 # To contact the author, see http://github.com/dijxtra/simplepyged
 
+from bisect import bisect_left, bisect_right
+
 from records import Individual
+from names import NameIndex, phonetic_codes
+
+# NumPy is optional, and only used by IndividualTable
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 class MatchIndividual():
     """ Class for determining whether an Individual matches certain criteria """
@@ -42,6 +51,32 @@ class MatchIndividual():
         (first,last) = self.individual.name()
         return first.find(name) >= 0
 
+    def surname_soundex_match(self,name):
+        """ Check if a word of the surname of an individual has the same
+        Soundex code as a word of name (see names.soundex()) """
+        (first,last) = self.individual.name()
+        return _sounds_like(last, name, "soundex")
+
+    def given_soundex_match(self,name):
+        """ Check if a given name of an individual has the same Soundex
+        code as a word of name (see names.soundex()) """
+        (first,last) = self.individual.name()
+        return _sounds_like(first, name, "soundex")
+
+    def surname_dm_match(self,name):
+        """ Check if a word of the surname of an individual has a
+        Daitch-Mokotoff code in common with a word of name (see
+        names.daitch_mokotoff()) """
+        (first,last) = self.individual.name()
+        return _sounds_like(last, name, "daitch_mokotoff")
+
+    def given_dm_match(self,name):
+        """ Check if a given name of an individual has a
+        Daitch-Mokotoff code in common with a word of name (see
+        names.daitch_mokotoff()) """
+        (first,last) = self.individual.name()
+        return _sounds_like(first, name, "daitch_mokotoff")
+
     def birth_year_match(self,year):
         """ Match the birth year of an individual.  Year is an integer. """
         return self.individual.birth_year() == year
@@ -75,78 +110,32 @@ class MatchIndividual():
 
         * surname=[name] - Match a person with [name] in any part of the surname.
         * name=[name] - Match a person with [name] in any part of the given name.
+        * soundex=[name] - Match a person whose surname has the same Soundex code as [name] (e.g. soundex=MacIntyre matches McIntyre).
+        * namesoundex=[name] - Match a person with a given name which has the same Soundex code as [name].
+        * dmsoundex=[name] - Match a person whose surname has a Daitch-Mokotoff code in common with [name].
+        * namedmsoundex=[name] - Match a person with a given name which has a Daitch-Mokotoff code in common with [name].
         * birth=[year] - Match a person whose birth year is a four-digit [year].
         * birthrange=[year1-year2] - Match a person whose birth year is in the range of years from [year1] to [year2], including both [year1] and [year2].
         * death=[year]
         * deathrange=[year1-year2]
         * marriage=[year]
         * marriagerange=[year1-year2]
-        
+
+        Criteria can also be given already compiled by compile_criteria().
         """
 
-        # error checking on the criteria
-        try:
-            for crit in criteria.split(':'):
-                key,value = crit.split('=')
-        except ValueError:
+        if isinstance(criteria, basestring):
+            criteria = compile_criteria(criteria)
+        if criteria is None:
             return False
-        match = True
-        for crit in criteria.split(':'):
-            key,value = crit.split('=')
-            if key == "surname" and not self.surname_match(value):
-                match = False
-            elif key == "name" and not self.given_match(value):
-                match = False
-            elif key == "birth":
-                try:
-                    year = int(value)
-                    if not self.birth_year_match(year):
-                        match = False
-                except ValueError:
-                    match = False
-            elif key == "birthrange":
-                try:
-                    year1,year2 = value.split('-')
-                    year1 = int(year1)
-                    year2 = int(year2)
-                    if not self.birth_range_match(year1,year2):
-                        match = False
-                except ValueError:
-                    match = False
-            elif key == "death":
-                try:
-                    year = int(value)
-                    if not self.death_year_match(year):
-                        match = False
-                except ValueError:
-                    match = False
-            elif key == "deathrange":
-                try:
-                    year1,year2 = value.split('-')
-                    year1 = int(year1)
-                    year2 = int(year2)
-                    if not self.death_range_match(year1,year2):
-                        match = False
-                except ValueError:
-                    match = False
-            elif key == "marriage":
-                try:
-                    year = int(value)
-                    if not self.marriage_year_match(year):
-                        match = False
-                except ValueError:
-                    match = False
-            elif key == "marriagerange":
-                try:
-                    year1,year2 = value.split('-')
-                    year1 = int(year1)
-                    year2 = int(year2)
-                    if not self.marriage_range_match(year1,year2):
-                        match = False
-                except ValueError:
-                    match = False
-                    
-        return match
+
+        for (method, args) in criteria:
+            try:
+                if not getattr(self, method)(*args):
+                    return False
+            except ValueError: # e.g. a date which doesn't end with a year
+                return False
+        return True
 
     def marriage_year_match(self,year):
         """ Check if one of the marriage years of an individual matches
@@ -172,6 +161,12 @@ class MatchList:
     in MatchList with same name which returns list of Individuals in
     the list for which given method returns True.
 
+    Indexes of the list (see name_index(), year_index() and table())
+    are built on first use, and built again when records is replaced
+    by another list, or when individuals are added to or removed from
+    it.  Changes which keep the same list of the same length (like
+    replacing an individual, or editing its records) are not noticed.
+
     Example:
 .. code-block:: python
 
@@ -185,14 +180,130 @@ class MatchList:
 
     def __init__(self, record_list):
         self.records = record_list
+        self._records_key = None
+        self._table = None
+        self._name_index = None
+        self._year_index = None
 
-        methods = [method for method in dir(MatchIndividual) if callable(getattr(MatchIndividual, method)) and not method.startswith('__') ]
+        methods = [method for method in dir(MatchIndividual) if callable(getattr(MatchIndividual, method)) and not method.startswith('__') and not hasattr(MatchList, method)]
 
         for method in methods:
             setattr(self, method, self.__factory(method))
 
+    def criteria_match(self, criteria):
+        """ Return list of Individuals in the list which match all of
+        the given criteria (see MatchIndividual.criteria_match()).
+
+        Criteria are parsed only once, and not for every individual.
+        Name criteria are looked up in name_index().  Year criteria are
+        looked up in table() if NumPy is installed, and otherwise only
+        the most selective of them is looked up in year_index().  Other
+        criteria are checked only for individuals which match those.
+        """
+        if isinstance(criteria, basestring):
+            criteria = compile_criteria(criteria)
+        if criteria is None:
+            return []
+
+        positions = None # positions of records which match so far
+        mask = None # NumPy mask of records which match year criteria
+        years = [] # year criteria, if NumPy isn't installed
+        others = []
+        for (method, args) in criteria:
+            if method in NameIndex.METHODS:
+                positions = _intersect(positions, self.name_index().positions(method, *args))
+            elif method in YearIndex.YEAR_METHODS:
+                if numpy is None:
+                    years.append((method, args))
+                elif mask is None:
+                    mask = self.table().mask(method, *args)
+                else:
+                    mask &= self.table().mask(method, *args)
+            else:
+                others.append((method, args))
+
+        if years != []:
+            index = self.year_index()
+            years.sort(key=lambda (method, args): index.count(method, *args))
+            (method, args) = years[0]
+            positions = _intersect(positions, index.positions(method, *args))
+            others = years[1:] + others
+
+        if mask is not None:
+            if positions is None:
+                positions = numpy.flatnonzero(mask)
+            else:
+                positions = [i for i in positions if mask[i]]
+
+        if positions is None:
+            return _scan(self.records, others)
+        return _scan([self.records[i] for i in positions], others)
+
+    def name_index(self):
+        """ Return a NameIndex of the list, which is built on the first
+        call.
+
+        Name criteria (including phonetic ones) and name methods of
+        MatchList (like surname_match() and surname_soundex_match())
+        are answered using this index.
+        """
+        self._check_records()
+        if self._name_index is None:
+            self._name_index = NameIndex(self.records)
+
+        return self._name_index
+
+    def year_index(self):
+        """ Return a YearIndex of the list, which is built on the first
+        call.
+
+        If NumPy isn't installed, year criteria and year methods of
+        MatchList (like birth_range_match()) are answered using this
+        index.
+        """
+        self._check_records()
+        if self._year_index is None:
+            self._year_index = YearIndex(self.records)
+
+        return self._year_index
+
+    def table(self):
+        """ Return an IndividualTable of the list, which is built on the
+        first call.  Requires NumPy.
+
+        If NumPy is installed, year criteria and year methods of
+        MatchList (like birth_range_match()) are answered using this
+        table.
+        """
+        self._check_records()
+        if self._table is None:
+            self._table = IndividualTable(self.records)
+
+        return self._table
+
+    def _check_records(self):
+        """ Drop indexes which were built for another list of records,
+        or for another length of the list """
+        # the list itself is kept (and not its id()), so that it can't
+        # be freed and its id given to another list
+        if self._records_key is not None:
+            (records, length) = self._records_key
+            if records is self.records and length == len(self.records):
+                return
+
+        self._records_key = (self.records, len(self.records))
+        self._table = None
+        self._name_index = None
+        self._year_index = None
+
     def __factory(self, method):
         def product(*args):
+            if method in NameIndex.METHODS:
+                return getattr(self.name_index(), method)(*args)
+            if method in YearIndex.YEAR_METHODS:
+                if numpy is None:
+                    return getattr(self.year_index(), method)(*args)
+                return getattr(self.table(), method)(*args)
             return self.__abstract(method, *args)
         return product
         
@@ -205,3 +316,337 @@ class MatchList:
         return retval
 
 
+class IndividualTable:
+    """ Table of birth, death and marriage years of a list of
+    individuals, for fast matching of year criteria
+
+    Years are read once, when the table is built, and stored in NumPy
+    arrays, so year and year range criteria are answered with
+    vectorized comparisons over whole arrays instead of calling
+    methods of every individual.  Unknown years are stored as -1
+    (see Individual.birth_year()).  Requires NumPy.
+
+    Methods birth_year_match(), birth_range_match(), death_year_match(),
+    death_range_match(), marriage_year_match(), marriage_range_match()
+    and criteria_match() return lists of individuals, like methods of
+    MatchList with the same names.
+
+    Example:
+.. code-block:: python
+
+    table = IndividualTable(gedcom.individual_list())
+    table.criteria_match("surname=McIntyre:birthrange=1820-1840")
+    """
+
+    YEAR_METHODS = ["birth_year_match", "birth_range_match",
+                    "death_year_match", "death_range_match",
+                    "marriage_year_match", "marriage_range_match"]
+
+    def __init__(self, record_list):
+        if numpy is None:
+            raise ImportError("IndividualTable requires NumPy")
+
+        self.records = list(record_list)
+        self.birth_years = numpy.array([e.birth_year() for e in self.records], dtype=numpy.int32)
+        self.death_years = numpy.array([e.death_year() for e in self.records], dtype=numpy.int32)
+
+        # an individual can marry more than once, so marriage years of
+        # all individuals are stored together with their indices
+        owners = []
+        years = []
+        # individuals with a marriage date which doesn't end with a year
+        # don't match any marriage criteria
+        self.marriage_errors = numpy.zeros(len(self.records), dtype=bool)
+        for (i, e) in enumerate(self.records):
+            try:
+                marriage_years = e.marriage_years()
+            except ValueError:
+                self.marriage_errors[i] = True
+                continue
+            for year in marriage_years:
+                if year != '':
+                    owners.append(i)
+                    years.append(year)
+        self.marriage_owners = numpy.array(owners, dtype=numpy.int32)
+        self.marriage_years = numpy.array(years, dtype=numpy.int32)
+
+    def birth_year_match(self, year):
+        """ Return list of individuals born in year """
+        return self.records_of(self.mask("birth_year_match", year))
+
+    def birth_range_match(self, year1, year2):
+        """ Return list of individuals born between year1 and year2 """
+        return self.records_of(self.mask("birth_range_match", year1, year2))
+
+    def death_year_match(self, year):
+        """ Return list of individuals who died in year """
+        return self.records_of(self.mask("death_year_match", year))
+
+    def death_range_match(self, year1, year2):
+        """ Return list of individuals who died between year1 and year2 """
+        return self.records_of(self.mask("death_range_match", year1, year2))
+
+    def marriage_year_match(self, year):
+        """ Return list of individuals who married in year """
+        return self.records_of(self.mask("marriage_year_match", year))
+
+    def marriage_range_match(self, year1, year2):
+        """ Return list of individuals who married between year1 and
+        year2 """
+        return self.records_of(self.mask("marriage_range_match", year1, year2))
+
+    def criteria_match(self, criteria):
+        """ Return list of individuals which match all of the given
+        criteria (see MatchIndividual.criteria_match()).
+
+        Masks of all year criteria are combined first, and other
+        criteria are checked only for individuals which match them.
+        """
+        if isinstance(criteria, basestring):
+            criteria = compile_criteria(criteria)
+        if criteria is None:
+            return []
+
+        mask = numpy.ones(len(self.records), dtype=bool)
+        others = []
+        for (method, args) in criteria:
+            if method in self.YEAR_METHODS:
+                mask &= self.mask(method, *args)
+            else:
+                others.append((method, args))
+
+        return _scan(self.records_of(mask), others)
+
+    def mask(self, method, *args):
+        """ Return a boolean NumPy array which is True for individuals
+        for which MatchIndividual method with given arguments returns
+        True.  Method must be one of YEAR_METHODS. """
+        if method == "birth_year_match":
+            return self.birth_years == args[0]
+        if method == "birth_range_match":
+            return self._range_mask(self.birth_years, *args)
+        if method == "death_year_match":
+            return self.death_years == args[0]
+        if method == "death_range_match":
+            return self._range_mask(self.death_years, *args)
+        if method == "marriage_year_match":
+            return self._marriage_mask(self.marriage_years == args[0])
+        if method == "marriage_range_match":
+            return self._marriage_mask(self._range_mask(self.marriage_years, *args))
+        raise ValueError("Not a year method: " + method)
+
+    def records_of(self, mask):
+        """ Return list of individuals for which mask is True """
+        return [self.records[i] for i in numpy.flatnonzero(mask)]
+
+    # Private methods
+
+    @staticmethod
+    def _range_mask(years, year1, year2):
+        return (years >= year1) & (years <= year2)
+
+    def _marriage_mask(self, marriage_mask):
+        """ Return mask of individuals with at least one marriage for
+        which marriage_mask is True """
+        mask = numpy.zeros(len(self.records), dtype=bool)
+        mask[self.marriage_owners[marriage_mask]] = True
+        return mask & ~self.marriage_errors
+
+
+class YearIndex:
+    """ Sorted indexes of birth, death and marriage years of a list of
+    individuals, for fast matching of year criteria without NumPy
+
+    Years are read once, when the index is built, and each kind of
+    years is kept in a list sorted by year, together with positions of
+    individuals in the list.  Individuals born (or deceased, or
+    married) in a range of years are then found by binary search, so
+    only individuals which match are visited.  Unknown years are
+    stored as -1 (see Individual.birth_year()).
+
+    Methods birth_year_match(), birth_range_match(), death_year_match(),
+    death_range_match(), marriage_year_match() and
+    marriage_range_match() return lists of individuals, like methods
+    of MatchList with the same names.
+
+    Example:
+.. code-block:: python
+
+    index = YearIndex(gedcom.individual_list())
+    index.birth_range_match(1800, 1810)
+    """
+
+    YEAR_METHODS = IndividualTable.YEAR_METHODS
+
+    def __init__(self, record_list):
+        self.records = list(record_list)
+        self._births = _YearColumn([(e.birth_year(), i) for (i, e) in enumerate(self.records)])
+        self._deaths = _YearColumn([(e.death_year(), i) for (i, e) in enumerate(self.records)])
+
+        # an individual can marry more than once, and individuals with
+        # a marriage date which doesn't end with a year don't match any
+        # marriage criteria
+        marriages = []
+        for (i, e) in enumerate(self.records):
+            try:
+                marriage_years = e.marriage_years()
+            except ValueError:
+                continue
+            marriages.extend([(year, i) for year in marriage_years if year != ''])
+        self._marriages = _YearColumn(marriages)
+
+    def birth_year_match(self, year):
+        """ Return list of individuals born in year """
+        return self._records(self.positions("birth_year_match", year))
+
+    def birth_range_match(self, year1, year2):
+        """ Return list of individuals born between year1 and year2 """
+        return self._records(self.positions("birth_range_match", year1, year2))
+
+    def death_year_match(self, year):
+        """ Return list of individuals who died in year """
+        return self._records(self.positions("death_year_match", year))
+
+    def death_range_match(self, year1, year2):
+        """ Return list of individuals who died between year1 and year2 """
+        return self._records(self.positions("death_range_match", year1, year2))
+
+    def marriage_year_match(self, year):
+        """ Return list of individuals who married in year """
+        return self._records(self.positions("marriage_year_match", year))
+
+    def marriage_range_match(self, year1, year2):
+        """ Return list of individuals who married between year1 and
+        year2 """
+        return self._records(self.positions("marriage_range_match", year1, year2))
+
+    def positions(self, method, *args):
+        """ Return sorted list of positions in the list of individuals
+        for which MatchIndividual method (one of YEAR_METHODS) with
+        given arguments returns True """
+        (column, year1, year2) = self._query(method, *args)
+        return column.positions(year1, year2)
+
+    def count(self, method, *args):
+        """ Return number of individuals (or of marriages, for marriage
+        methods) for which MatchIndividual method (one of
+        YEAR_METHODS) with given arguments returns True, without
+        finding them """
+        (column, year1, year2) = self._query(method, *args)
+        (start, end) = column.bounds(year1, year2)
+        return end - start
+
+    # Private methods
+
+    def _query(self, method, *args):
+        """ Return column and range of years for method """
+        if method.startswith("birth_"):
+            column = self._births
+        elif method.startswith("death_"):
+            column = self._deaths
+        elif method.startswith("marriage_"):
+            column = self._marriages
+        else:
+            raise ValueError("Not a year method: " + method)
+        if method.endswith("_year_match"):
+            return (column, args[0], args[0])
+        return (column, args[0], args[1])
+
+    def _records(self, positions):
+        return [self.records[i] for i in positions]
+
+class _YearColumn:
+    """ Index of one kind of years """
+
+    def __init__(self, pairs):
+        pairs.sort()
+        self._years = [year for (year, i) in pairs]
+        self._positions = [i for (year, i) in pairs]
+
+    def bounds(self, year1, year2):
+        if year1 > year2:
+            return (0, 0)
+        return (bisect_left(self._years, year1), bisect_right(self._years, year2))
+
+    def positions(self, year1, year2):
+        (start, end) = self.bounds(year1, year2)
+        return sorted(set(self._positions[start:end]))
+
+
+def _intersect(positions, found):
+    """ Return sorted positions which are in both lists, where
+    positions can be None (no positions were found yet) """
+    if positions is None:
+        return found
+    found = set(found)
+    return [i for i in positions if i in found]
+
+def _scan(records, criteria):
+    """ Return list of records which match all of compiled criteria """
+    m = MatchIndividual(None)
+    matchers = [(getattr(m, method), args) for (method, args) in criteria]
+
+    retval = []
+    for record in records:
+        m.individual = record
+        try:
+            for (matcher, args) in matchers:
+                if not matcher(*args):
+                    break
+            else:
+                retval.append(record)
+        except ValueError: # e.g. a date which doesn't end with a year
+            pass
+
+    return retval
+
+def _sounds_like(name, other, coding):
+    return len(phonetic_codes(name, coding) & phonetic_codes(other, coding)) > 0
+
+def compile_criteria(criteria):
+    """ Parse criteria (see MatchIndividual.criteria_match()), so that
+    they can be matched against many individuals without parsing them
+    again.
+
+    Returns a list of tuples (method, args), where method is a name of
+    a method of MatchIndividual, and args is a tuple of its arguments.
+    An individual matches criteria if all of those methods return True.
+    Unknown criteria are left out.  Returns None if criteria can't be
+    matched by any individual, because they are malformed.
+    """
+    compiled = []
+    try:
+        for crit in criteria.split(':'):
+            key,value = crit.split('=')
+            if key in _CRITERIA:
+                (method, parse) = _CRITERIA[key]
+                compiled.append((method, parse(value)))
+    except ValueError:
+        return None
+
+    return compiled
+
+def _name(value):
+    return (value,)
+
+def _year(value):
+    return (int(value),)
+
+def _range(value):
+    year1,year2 = value.split('-')
+    return (int(year1), int(year2))
+
+_CRITERIA = {
+    "surname": ("surname_match", _name),
+    "name": ("given_match", _name),
+    "soundex": ("surname_soundex_match", _name),
+    "namesoundex": ("given_soundex_match", _name),
+    "dmsoundex": ("surname_dm_match", _name),
+    "namedmsoundex": ("given_dm_match", _name),
+    "birth": ("birth_year_match", _year),
+    "birthrange": ("birth_range_match", _range),
+    "death": ("death_year_match", _year),
+    "deathrange": ("death_range_match", _range),
+    "marriage": ("marriage_year_match", _year),
+    "marriagerange": ("marriage_range_match", _range),
+    }
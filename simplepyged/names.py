@@ -0,0 +1,375 @@
+#-*- coding: utf-8 -*-
+#
+# Gedcom 5.5 Parser
+#
+# Copyright (C) 2010 Nikola Škorić (nskoric [ at ] gmail.com)
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+#
+# Please see the GPL license at http://www.gnu.org/licenses/gpl.txt
+#
+# To contact the author, see http://github.com/dijxtra/simplepyged
+
+
+# Global imports
+from bisect import bisect_left
+
+class NameIndex:
+    """ Index of surnames and given names of a list of individuals
+
+    Names of all individuals (see Individual.name()) are read once,
+    when the index is built.  Exact names are looked up in a
+    dictionary, prefixes by binary search in a sorted list of distinct
+    names, and substrings through an index of trigrams (substrings of
+    three characters) of distinct names: only names which contain all
+    trigrams of the searched string are checked if they really contain
+    it.  Phonetic codes (see phonetic_codes()) of distinct names are
+    also computed when the index is built, and are looked up in
+    dictionaries of codes, so names which sound alike are found as
+    fast as exact names.
+
+    Methods return lists of individuals in the same order as in the
+    list from which the index was built.  surname_match() and
+    given_match() return the same individuals as methods of MatchList
+    with the same names.
+
+    Example:
+.. code-block:: python
+
+    index = NameIndex(gedcom.individual_list())
+    index.surname_match('Intyre')
+    index.surname_soundex_match('MacIntyre') # finds McIntyres too
+    """
+
+    METHODS = ["surname_match", "given_match",
+               "surname_soundex_match", "given_soundex_match",
+               "surname_dm_match", "given_dm_match"]
+
+    def __init__(self, record_list):
+        self.records = list(record_list)
+        names = [e.name() for e in self.records]
+        self._given_names = _NameColumn([first for (first, last) in names])
+        self._surnames = _NameColumn([last for (first, last) in names])
+
+    def surname_match(self, name):
+        """ Return list of individuals with name in any part of the
+        surname """
+        return self._records(self._surnames.substring(name))
+
+    def given_match(self, name):
+        """ Return list of individuals with name in any part of the
+        given name """
+        return self._records(self._given_names.substring(name))
+
+    def surname_exact(self, name):
+        """ Return list of individuals whose surname is name """
+        return self._records(self._surnames.exact(name))
+
+    def given_exact(self, name):
+        """ Return list of individuals whose given name is name """
+        return self._records(self._given_names.exact(name))
+
+    def surname_prefix(self, prefix):
+        """ Return list of individuals whose surname starts with prefix """
+        return self._records(self._surnames.prefix(prefix))
+
+    def given_prefix(self, prefix):
+        """ Return list of individuals whose given name starts with
+        prefix """
+        return self._records(self._given_names.prefix(prefix))
+
+    def surname_soundex_match(self, name):
+        """ Return list of individuals with a word of the surname
+        which has the same Soundex code as a word of name """
+        return self._records(self._surnames.sounds_like(name, "soundex"))
+
+    def given_soundex_match(self, name):
+        """ Return list of individuals with a given name which has the
+        same Soundex code as a word of name """
+        return self._records(self._given_names.sounds_like(name, "soundex"))
+
+    def surname_dm_match(self, name):
+        """ Return list of individuals with a word of the surname
+        which has a Daitch-Mokotoff code in common with a word of
+        name """
+        return self._records(self._surnames.sounds_like(name, "daitch_mokotoff"))
+
+    def given_dm_match(self, name):
+        """ Return list of individuals with a given name which has a
+        Daitch-Mokotoff code in common with a word of name """
+        return self._records(self._given_names.sounds_like(name, "daitch_mokotoff"))
+
+    def positions(self, method, name):
+        """ Return sorted list of positions in the list of individuals
+        for which MatchIndividual method (one of METHODS) with given
+        name returns True """
+        if method == "surname_match":
+            return self._surnames.substring(name)
+        if method == "given_match":
+            return self._given_names.substring(name)
+        if method == "surname_soundex_match":
+            return self._surnames.sounds_like(name, "soundex")
+        if method == "given_soundex_match":
+            return self._given_names.sounds_like(name, "soundex")
+        if method == "surname_dm_match":
+            return self._surnames.sounds_like(name, "daitch_mokotoff")
+        if method == "given_dm_match":
+            return self._given_names.sounds_like(name, "daitch_mokotoff")
+        raise ValueError("Not a name method: " + method)
+
+    # Private methods
+
+    def _records(self, positions):
+        return [self.records[i] for i in positions]
+
+class _NameColumn:
+    """ Index of one kind of names """
+
+    def __init__(self, names):
+        # positions of individuals with each distinct name
+        self._positions = {}
+        for (i, name) in enumerate(names):
+            if name is not None:
+                self._positions.setdefault(name, []).append(i)
+
+        self._names = sorted(self._positions)
+
+        # trigram -> numbers of distinct names (in self._names) which
+        # contain it
+        self._trigrams = {}
+        for (n, name) in enumerate(self._names):
+            for trigram in set(_trigrams(name)):
+                self._trigrams.setdefault(trigram, []).append(n)
+
+        # coding -> phonetic code -> numbers of distinct names which
+        # have it
+        self._codes = {}
+        for coding in PHONETIC_CODES:
+            codes = self._codes[coding] = {}
+            for (n, name) in enumerate(self._names):
+                for code in phonetic_codes(name, coding):
+                    codes.setdefault(code, []).append(n)
+
+    def exact(self, name):
+        return list(self._positions.get(name, []))
+
+    def prefix(self, prefix):
+        names = []
+        n = bisect_left(self._names, prefix)
+        while n < len(self._names) and self._names[n].startswith(prefix):
+            names.append(self._names[n])
+            n += 1
+        return self._merge(names)
+
+    def substring(self, string):
+        if len(string) < 3:
+            candidates = self._names
+        else:
+            postings = [self._trigrams.get(t, []) for t in set(_trigrams(string))]
+            postings.sort(key=len)
+            numbers = set(postings[0])
+            for p in postings[1:]:
+                if not numbers:
+                    break
+                numbers.intersection_update(p)
+            candidates = [self._names[n] for n in numbers]
+
+        return self._merge([name for name in candidates if name.find(string) >= 0])
+
+    def sounds_like(self, name, coding):
+        numbers = set()
+        for code in phonetic_codes(name, coding):
+            numbers.update(self._codes[coding].get(code, []))
+        return self._merge([self._names[n] for n in numbers])
+
+    def _merge(self, names):
+        """ Return sorted positions of individuals with given names """
+        if len(names) == 1:
+            return list(self._positions[names[0]])
+        positions = []
+        for name in names:
+            positions.extend(self._positions[name])
+        positions.sort()
+        return positions
+
+def _trigrams(string):
+    return [string[i:i + 3] for i in xrange(len(string) - 2)]
+
+# Phonetic codes
+
+_SOUNDEX = {}
+for (letters, digit) in [("BFPV", "1"), ("CGJKQSXZ", "2"), ("DT", "3"),
+                         ("L", "4"), ("MN", "5"), ("R", "6")]:
+    for letter in letters:
+        _SOUNDEX[letter] = digit
+
+def soundex(name):
+    """ Return American Soundex code of name (e.g. 'M253' for both
+    'McIntyre' and 'MacIntyre'), or '' if name has no letters.
+    Characters other than letters A to Z are ignored. """
+    name = _letters(name)
+    if name == '':
+        return ''
+
+    code = name[0]
+    last = _SOUNDEX.get(name[0], '')
+    for letter in name[1:]:
+        if letter in "HW": # H and W don't separate equal digits
+            continue
+        digit = _SOUNDEX.get(letter, '')
+        if digit != '' and digit != last:
+            code += digit
+            if len(code) == 4:
+                break
+        last = digit
+    return (code + "000")[:4]
+
+# Daitch-Mokotoff rules: letters, and codes at the start of a name,
+# before a vowel, and elsewhere.  '' means that letters aren't coded,
+# and '|' separates alternative codes of letters which can be
+# pronounced in more than one way.
+_DM_RULES = [
+    ("AI AJ AY", "0", "1", ""),
+    ("AU", "0", "7", ""),
+    ("A", "0", "", ""),
+    ("B", "7", "7", "7"),
+    ("CHS", "5", "54", "54"),
+    ("CH", "5|4", "5|4", "5|4"),
+    ("CK", "5|45", "5|45", "5|45"),
+    ("CZ CS CSZ CZS", "4", "4", "4"),
+    ("C", "5|4", "5|4", "5|4"),
+    ("DRZ DRS", "4", "4", "4"),
+    ("DS DSH DSZ", "4", "4", "4"),
+    ("DZ DZH DZS", "4", "4", "4"),
+    ("D DT", "3", "3", "3"),
+    ("EI EJ EY", "0", "1", ""),
+    ("EU", "1", "1", ""),
+    ("E", "0", "", ""),
+    ("FB F", "7", "7", "7"),
+    ("G", "5", "5", "5"),
+    ("H", "5", "5", ""),
+    ("IA IE IO IU", "1", "", ""),
+    ("I", "0", "", ""),
+    ("J", "1|4", "1|4", "1|4"),
+    ("KS", "5", "54", "54"),
+    ("KH K", "5", "5", "5"),
+    ("L", "8", "8", "8"),
+    ("MN NM", "66", "66", "66"),
+    ("M", "6", "6", "6"),
+    ("N", "6", "6", "6"),
+    ("OI OJ OY", "0", "1", ""),
+    ("O", "0", "", ""),
+    ("P PF PH", "7", "7", "7"),
+    ("Q", "5", "5", "5"),
+    ("RZ RS", "94|4", "94|4", "94|4"),
+    ("R", "9", "9", "9"),
+    ("SCHTSCH SCHTSH SCHTCH", "2", "4", "4"),
+    ("SCH", "4", "4", "4"),
+    ("SHTCH SHCH SHTSH", "2", "4", "4"),
+    ("SHT SCHT SCHD", "2", "43", "43"),
+    ("SH", "4", "4", "4"),
+    ("STCH STSCH SC", "2", "4", "4"),
+    ("STRZ STRS STSH", "2", "4", "4"),
+    ("ST", "2", "43", "43"),
+    ("SZCZ SZCS", "2", "4", "4"),
+    ("SZT SHD SZD SD", "2", "43", "43"),
+    ("SZ", "4", "4", "4"),
+    ("S", "4", "4", "4"),
+    ("TCH TTCH TTSCH", "4", "4", "4"),
+    ("TH", "3", "3", "3"),
+    ("TRZ TRS", "4", "4", "4"),
+    ("TSCH TSH", "4", "4", "4"),
+    ("TS TTS TTSZ TC", "4", "4", "4"),
+    ("TZ TTZ TZS TSZ", "4", "4", "4"),
+    ("T", "3", "3", "3"),
+    ("UI UJ UY", "0", "1", ""),
+    ("U UE", "0", "", ""),
+    ("V W", "7", "7", "7"),
+    ("X", "5", "54", "54"),
+    ("Y", "1", "", ""),
+    ("ZDZ ZDZH ZHDZH", "2", "4", "4"),
+    ("ZD ZHD", "2", "43", "43"),
+    ("ZH ZS ZSCH ZSH", "4", "4", "4"),
+    ("Z", "4", "4", "4"),
+    ]
+
+# first letter -> rules for letters starting with it, longest first
+_DM_TABLE = {}
+for (patterns, start, before_vowel, other) in _DM_RULES:
+    for pattern in patterns.split():
+        _DM_TABLE.setdefault(pattern[0], []).append(
+            (pattern, start.split('|'), before_vowel.split('|'), other.split('|')))
+for rules in _DM_TABLE.values():
+    rules.sort(key=lambda rule: -len(rule[0]))
+
+def daitch_mokotoff(name):
+    """ Return sorted list of Daitch-Mokotoff Soundex codes of name
+    (e.g. ['645740'] for 'Moskowitz', or ['097400', '097500'] for
+    'Auerbach', which can be pronounced in two ways), or [] if name
+    has no letters.  Characters other than letters A to Z are
+    ignored. """
+    name = _letters(name)
+    if name == '':
+        return []
+
+    # every branch is a pair (code, last coded letters)
+    branches = set([('', None)])
+    i = 0
+    while i < len(name):
+        for (pattern, start, before_vowel, other) in _DM_TABLE[name[i]]:
+            if name.startswith(pattern, i):
+                break
+        end = i + len(pattern)
+        if i == 0:
+            replacements = start
+        elif end < len(name) and name[end] in "AEIOU":
+            replacements = before_vowel
+        else:
+            replacements = other
+
+        # adjacent letters with the same code are coded once, except
+        # for MN and NM
+        force = pattern in ("MN", "NM")
+        new_branches = set()
+        for (code, last) in branches:
+            for replacement in replacements:
+                if last is None or force or not last.endswith(replacement):
+                    new_branches.add(((code + replacement)[:6], replacement))
+                else:
+                    new_branches.add((code, replacement))
+        branches = new_branches
+        i = end
+
+    return sorted(set([(code + "000000")[:6] for (code, last) in branches]))
+
+PHONETIC_CODES = {
+    "soundex": lambda word: [soundex(word)],
+    "daitch_mokotoff": daitch_mokotoff,
+    }
+
+def phonetic_codes(name, coding = "soundex"):
+    """ Return set of phonetic codes of all words of name, where coding
+    is "soundex" or "daitch_mokotoff".  Two names sound alike if they
+    have a code in common. """
+    codes = set()
+    if name is None:
+        return codes
+    for word in name.split():
+        codes.update(PHONETIC_CODES[coding](word))
+    codes.discard('')
+    return codes
+
+def _letters(name):
+    return ''.join([c for c in name.upper() if 'A' <= c <= 'Z'])
@@ -26,7 +26,10 @@
 import string
 from events import Event
 
-class Line:
+# children of all lines without children, when they are only read
+_NO_CHILDREN = ()
+
+class Line(object):
     """ Line of a GEDCOM file
 
     Each line in a Gedcom file has following format:
@@ -52,6 +55,9 @@ class Line:
 
     """
 
+    __slots__ = ('_level', '_xref', '_tag', '_value', '_dict',
+                 '_children_lines', '_parent_line', '__weakref__')
+
     def __init__(self,level,xref,tag,value,dict):
         """ Initialize a line.  You must include a level, xref,
         tag, value, and global line dictionary.  Normally initialized
@@ -64,7 +70,7 @@ class Line:
         self._value = value
         self._dict = dict
         # structuring
-        self._children_lines = []
+        self._children_lines = None # no list until the first child
         self._parent_line = None
 
     def _init(self):
@@ -95,7 +101,9 @@ class Line:
         return self._value
 
     def children_lines(self):
-        """ Return the child lines of this line """
+        """ Return the list of child lines of this line """
+        if self._children_lines is None:
+            self._children_lines = []
         return self._children_lines
 
     def parent_line(self):
@@ -113,7 +121,7 @@ class Line:
     def children_tags(self, tag):
         """ Returns list of child lines whos tag matches the argument. """
         lines = []
-        for c in self.children_lines():
+        for c in self._child_lines():
             if c.tag() == tag:
                 lines.append(c)
 
@@ -133,10 +141,17 @@ class Line:
     def gedcom(self):
         """ Return GEDCOM code for this line and all of its sub-lines """
         result = unicode(self)
-        for e in self.children_lines():
+        for e in self._child_lines():
             result += '\n' + e.gedcom()
         return result
 
+    def _child_lines(self):
+        """ Return the child lines of this line, without creating a
+        list for a line without children """
+        if self._children_lines is None:
+            return _NO_CHILDREN
+        return self._children_lines
+
     def __str__(self):
         """ Format this line as its original string """
         result = unicode(self.level())
@@ -153,39 +168,71 @@ class Record(Line):
 
     Child class of Line
 
+    Records keep an index of their child lines by tag, which is built
+    the first time children_tags() is called.  The index is dropped
+    whenever children_lines() hands out the list of child lines (which
+    may then be changed), and is built again when it is needed.
+
     """
+
+    __slots__ = ('_tag_index',)
+
+    def __init__(self,level,xref,tag,value,dict):
+        Line.__init__(self,level,xref,tag,value,dict)
+        self._tag_index = None
+
+    def children_lines(self):
+        """ Return the list of child lines of this line """
+        self._tag_index = None
+        return Line.children_lines(self)
+
+    def children_tags(self, tag):
+        """ Returns list of child lines whos tag matches the argument. """
+        return list(self._children_with_tag(tag))
+
+    def _children_with_tag(self, tag):
+        if self._tag_index is None:
+            index = {}
+            for c in self._child_lines():
+                try:
+                    index[c.tag()].append(c)
+                except KeyError:
+                    index[c.tag()] = [c]
+            self._tag_index = index
+
+        return self._tag_index.get(tag, _NO_CHILDREN)
     
     def _parse_generic_event_list(self, tag):
         """ Creates new event for each line with given tag"""
         retval = []
-        for event_line in self.children_tags(tag):
+        for event_line in self._children_with_tag(tag):
             retval.append(Event(event_line))
 
         return retval
 
 
 class Multimedia(Record):
-    pass
+    __slots__ = ()
 
 
 class Note(Record):
-    pass
+    __slots__ = ()
 
 
 class Repository(Record):
-    pass
+    __slots__ = ()
 
 
 class Source(Record):
-    pass
+    __slots__ = ()
 
 
 class Submission(Record):
-    pass
+    __slots__ = ()
 
 
 class Submitter(Record):
-    pass
+    __slots__ = ()
 
 
 class Individual(Record):
@@ -193,24 +240,67 @@ class Individual(Record):
 
     Child class of Record
 
+    If the FamilyGraph of the Gedcom file is attached to individuals
+    (see Gedcom.attach_graph()), parents(), children(), down_path()
+    and path_to_relative() follow the graph instead of records, so
+    they reflect the file at the time the graph was built.
+
     """
 
+    __slots__ = ('_parent_families', '_families', '_graph',
+                 '_birth_events', '_death_events', '_other_events')
+
     def __init__(self,level,xref,tag,value,dict):
         Record.__init__(self,level,xref,tag,value,dict)
-
-    def _init(self):
-        """ Implementing Line._init() """
-        self._parent_families = self.get_parent_families()
-        self._families = self.get_families()
-
-        self.birth_events = self._parse_generic_event_list("BIRT")
-        self.death_events = self._parse_generic_event_list("DEAT")
-        self.other_events = []
-        for event_type in ["ADOP", "BAPM", "BARM", "BASM", "BLES", "BURI",
-                           "CENS", "CHR", "CHRA", "CONF", "CREM", "EMIG",
-                           "FCOM", "GRAD", "IMMI", "NATU", "ORDN", "RETI",
-                           "PROB", "WILL", "EVEN"]:
-            self.other_events.extend(self._parse_generic_event_list(event_type))
+        self._parent_families = None
+        self._families = None
+        # FamilyGraph of the Gedcom file, once Gedcom.attach_graph()
+        # attached it
+        self._graph = None
+        self._birth_events = None
+        self._death_events = None
+        self._other_events = None
+
+    # Events are parsed the first time they are accessed, unless they
+    # were assigned before
+
+    @property
+    def birth_events(self):
+        """ List of birth events """
+        if self._birth_events is None:
+            self._birth_events = self._parse_generic_event_list("BIRT")
+        return self._birth_events
+
+    @birth_events.setter
+    def birth_events(self, events):
+        self._birth_events = events
+
+    @property
+    def death_events(self):
+        """ List of death events """
+        if self._death_events is None:
+            self._death_events = self._parse_generic_event_list("DEAT")
+        return self._death_events
+
+    @death_events.setter
+    def death_events(self, events):
+        self._death_events = events
+
+    @property
+    def other_events(self):
+        """ List of all other events """
+        if self._other_events is None:
+            self._other_events = []
+            for event_type in ["ADOP", "BAPM", "BARM", "BASM", "BLES", "BURI",
+                               "CENS", "CHR", "CHRA", "CONF", "CREM", "EMIG",
+                               "FCOM", "GRAD", "IMMI", "NATU", "ORDN", "RETI",
+                               "PROB", "WILL", "EVEN"]:
+                self._other_events.extend(self._parse_generic_event_list(event_type))
+        return self._other_events
+
+    @other_events.setter
+    def other_events(self, events):
+        self._other_events = events
 
     def sex(self):
         """ Returns 'M' for males, 'F' for females, or None if not specified """
@@ -220,9 +310,15 @@ class Individual(Record):
             return None
 
     def parent_families(self):
+        # families are looked up on first use, so that records of
+        # lazily parsed files are not parsed before they are needed
+        if self._parent_families is None:
+            self._parent_families = self.get_parent_families()
         return self._parent_families
 
     def families(self):
+        if self._families is None:
+            self._families = self.get_families()
         return self._families
 
     def father(self):
@@ -252,6 +348,10 @@ class Individual(Record):
         return mothers
 
     def children(self):
+        graph = self._graph
+        if graph is not None:
+            return [graph.individual(c) for c in graph.children_of(graph.id(self))]
+
         retval = []
 
         for f in self.families():
@@ -272,7 +372,7 @@ class Individual(Record):
         """ Return a person's names as a tuple: (first,last) """
         first = ""
         last = ""
-        for e in self.children_lines():
+        for e in self._child_lines():
             if e.tag() == "NAME":
                 # some older Gedcom files don't use child tags but instead
                 # place the name in the value of the NAME tag
@@ -281,7 +381,7 @@ class Individual(Record):
                     first = string.strip(name[0])
                     last = string.strip(name[1]) if len(name) > 1 else None
                 else:
-                    for c in e.children_lines():
+                    for c in e._child_lines():
                         if c.tag() == "GIVN":
                             first = c.value()
                         if c.tag() == "SURN":
@@ -395,48 +495,147 @@ class Individual(Record):
     def parents(self):
         """ Return list of parents of this Individual """
 
+        graph = self._graph
+        if graph is not None:
+            # husband and wife of every parent family, None if missing
+            parents = []
+            for f in graph.parent_families_of(graph.id(self)):
+                for p in (graph.husbands[f], graph.wives[f]):
+                    if p >= 0:
+                        parents.append(graph.individual(p))
+                    else:
+                        parents.append(None)
+            return parents
+
         parent_pairs = map(lambda x: x.parents(), self.parent_families())
 
         return [parent for parent_pair in parent_pairs for parent in parent_pair]   
 
+    def iter_ancestors(self, max_depth = None):
+        """ Iterate over ancestors of this Individual
+
+        Yields tuples (ancestor, generation), where generation is 1 for
+        parents, 2 for grandparents and so on, breadth-first (all
+        ancestors of one generation before any ancestor of the next
+        one).  Every ancestor is yielded only once, at the nearest
+        generation, even if it can be reached through more than one
+        line.  If max_depth is given, ancestors more than max_depth
+        generations away are not searched.
+        """
+        return self._iter_generations(lambda p: p.parents(), max_depth)
+
+    def iter_descendants(self, max_depth = None):
+        """ Iterate over descendants of this Individual
+
+        Yields tuples (descendant, generation), where generation is 1
+        for children, 2 for grandchildren and so on, in the same way
+        as iter_ancestors().
+        """
+        return self._iter_generations(lambda p: p.children(), max_depth)
+
+    def _iter_generations(self, next_generation, max_depth):
+        seen = set([self.xref()])
+        generation = [self]
+        depth = 0
+        while generation != [] and (max_depth is None or depth < max_depth):
+            depth += 1
+            new = []
+            for p in generation:
+                for e in next_generation(p):
+                    if e is not None and e.xref() not in seen:
+                        seen.add(e.xref())
+                        new.append(e)
+                        yield (e, depth)
+            generation = new
+
     def common_ancestor(self, relative):
-        """ Find a common ancestor with a relative """
+        """ Find a common ancestor with a relative
+
+        Ancestors of both self and relative are searched generation by
+        generation, and the first common ancestor found is returned.
+        """
 
         if relative is None:
             return None
 
-        me = {}
-        him = {}
-        
-        me['new'] = [self]
-        me['old'] = []
-        him['new'] = [relative]
-        him['old'] = []
+        # ancestors are identified by xref
+        me = {'new': [self], 'seen': set([self.xref()])}
+        him = {'new': [relative], 'seen': set([relative.xref()])}
 
         while(me['new'] != [] or him['new'] != []): #loop until we have no new ancestors to compare
+            his_new = set([p.xref() for p in him['new']])
             for p in me['new']: #compare new ancestors of both me and him
-                if p in him['new']:
+                if p.xref() in his_new:
                     return p
 
             #compare new ancestors to old ones
             for p in me['new']:
-                if p in him['old']:
+                if p.xref() in him['seen']:
                     return p
 
             for p in him['new']:
-                if p in me['old']:
+                if p.xref() in me['seen']:
                     return p
 
             for l in [me, him]: # do this for both me and him
-                new = []
-                for p in l['new']: #find parents of all memebers of 'new'
-                    new.extend(p.parents())
-                new = filter(lambda x: x is not None, new)
-                l['old'].extend(l['new']) #copy members of 'new' to 'old'
-                l['new'] = new #parents of 'new' members became themselves 'new'
+                l['new'] = self._new_parents(l['new'], l['seen'])
 
         return None
 
+    def lowest_common_ancestors(self, relative):
+        """ Find all lowest common ancestors with a relative
+
+        Lowest common ancestors are those common ancestors which are
+        not ancestors of another common ancestor.  For example, lowest
+        common ancestors of siblings are their father and mother.
+
+        Returns a list of tuples (ancestor, my_distance, his_distance),
+        where my_distance and his_distance are the distances from self
+        and relative to the ancestor in number of generations (see
+        distance_to_ancestor()).  The list is ordered by the sum of
+        those distances.
+        """
+
+        if relative is None:
+            return []
+
+        mine = self._ancestor_distances()
+        his = relative._ancestor_distances()
+
+        common = [(mine[x][0], mine[x][1], his[x][1]) for x in mine if x in his]
+
+        # ancestors of common ancestors aren't lowest common ancestors
+        seen = set()
+        generation = [a for (a, d1, d2) in common]
+        while generation != []:
+            generation = self._new_parents(generation, seen)
+
+        lowest = [c for c in common if c[0].xref() not in seen]
+        lowest.sort(key=lambda (a, d1, d2): (d1 + d2, d1))
+        return lowest
+
+    def _ancestor_distances(self):
+        """ Return a dictionary which maps xrefs of self and all of its
+        ancestors to tuples (ancestor, distance). """
+        distances = {self.xref(): (self, 0)}
+        for (p, distance) in self.iter_ancestors():
+            distances[p.xref()] = (p, distance)
+
+        return distances
+
+    @staticmethod
+    def _new_parents(generation, seen):
+        """ Return parents of members of generation which are not in
+        seen (a set of xrefs), and add them to seen. """
+        new = []
+        for p in generation:
+            for parent in p.parents():
+                if parent is not None and parent.xref() not in seen:
+                    seen.add(parent.xref())
+                    new.append(parent)
+
+        return new
+
     def mutual_families(self, candidate):
         """Return mutual families of self and candidate. """
         mutual_families = []
@@ -444,7 +643,8 @@ class Individual(Record):
         for my_family in self.parent_families():
             if my_family in candidate.parent_families():
                 mutual_families.append(my_family)
-                
+
+        return mutual_families
 
     def is_parent(self, candidate):
         """ Determine if candidate is parent of self """
@@ -499,84 +699,264 @@ class Individual(Record):
     def down_path(ancestor, descendant, distance = None):
         """ Return path between ancestor and descendant (do not go deeper than distance depth) """
 
-        if distance is not None:
-            if distance <= 0:
+        graph = ancestor._graph
+        if graph is not None:
+            path = Individual._down_path(graph.id(ancestor), graph.id(descendant), distance,
+                                         graph.children_of, None)
+            if path is None:
                 return None
+            return [graph.individual(p) for p in path]
+
+        return Individual._down_path(ancestor, descendant, distance,
+                                     lambda p: p.children(), Individual.xref)
+
+    @staticmethod
+    def _down_path(ancestor, descendant, distance, children, key):
+        """ Search for down_path() through given function children,
+        where key returns the key by which individuals are remembered
+        (individuals themselves if key is None) """
+        if key is None:
+            key = lambda p: p
+
+        # descendants of ancestor are searched generation by
+        # generation, each of them mapped to a tuple (parent through
+        # which it was reached, distance)
+        previous = {key(ancestor): (None, 0)}
+        generation = [ancestor]
+        depth = 0
+        while generation != [] and (distance is None or depth < distance):
+            depth += 1
+            new = []
+            for p in generation:
+                for c in children(p):
+                    if key(c) in previous:
+                        continue
+                    previous[key(c)] = (p, depth)
+                    if key(c) == key(descendant):
+                        path = Individual._path_back(previous, p, key)
+                        path.reverse()
+                        return path
+                    new.append(c)
+            generation = new
 
-        if ancestor.children() == []:
-            return None
-        
-        if descendant in ancestor.children():
-            return [ancestor]
-
-        for c in ancestor.children():
-            if distance is None:
-                path = ancestor.down_path(c, descendant)
-            else:
-                path = ancestor.down_path(c, descendant, distance - 1)
-            if path is not None:
-                path.insert(0, ancestor)
-                return path
-    
         return None
 
-    def path_to_relative(self, relative):
+    def path_to_relative(self, relative, graph = None):
         """ Find path to a relative
 
-        Returns a list of tuples (ancestor, direction) where:
-        * ancestor is a person in the path between self and relative
-        * direction is 'up' if this step in the path is parent of previous step
-        * direction is 'down' if this step in the path is child of previous step
+        Returns a list of tuples (person, relation) where:
+        * person is a person in the path between self and relative
+        * relation is 'start' for self
+        * relation is 'parent' if person is parent of previous step
+        * relation is 'child' if person is child of previous step
+        * relation is 'sibling' if person is sibling of previous step
+
+        Returns None if relative is not a relative of self.
+
+        If graph (the FamilyGraph of the Gedcom file, see
+        Gedcom.graph()) is given, or it is attached to individuals (see
+        Gedcom.attach_graph()), None is returned right away when self
+        and relative are not connected at all.
         """
 
         if relative == self:
             return []
 
-        if relative in self.parents():
-            return [[self, 'start'], [relative, 'parent']]
-        
-        common_ancestor = self.common_ancestor(relative)
+        if graph is None:
+            graph = self._graph
+        if graph is not None and not graph.connected(graph.id(self), graph.id(relative)):
+            return None
 
-        if common_ancestor is None: # is not relative
+        paths = self._paths_to_common_ancestor(relative)
+        if paths is None: # is not relative
             return None
+        (my_path, his_path) = paths
+
+        return self._path_steps(my_path, his_path)
+
+    def relationships(self):
+        """ Find relationships to all relatives at once
+
+        Returns a dictionary which maps xref of each relative (and of
+        self) to a tuple (relative, common_ancestor, up, down, path)
+        where:
+        * common_ancestor is the common ancestor of self and relative
+        * up is the distance from self to common_ancestor
+        * down is the distance from common_ancestor to relative
+        * path is the path from self to relative (as returned by
+          path_to_relative())
+
+        The common ancestor is the one through which the path is the
+        shortest, preferring a direct line (i.e. the common ancestor
+        being self or relative).  In a tree with pedigree collapse,
+        this may be a different common ancestor than the one used by
+        path_to_relative().
+
+        Ancestors of self are searched once, and then descendants of
+        all of them together, so this is much faster than calling
+        path_to_relative() for every relative.
+        """
 
-        if common_ancestor == self:
-            my_path = []
-        else:
-            my_path = self.down_path(common_ancestor, self, self.distance_to_ancestor(common_ancestor))
+        # ancestors are mapped to tuples (child through which they
+        # were reached, distance)
+        ancestors = {self.xref(): (None, 0)}
+        queues = [[(0, self, self, None)]]
+        generation = [self]
+        depth = 0
+        while generation != []:
+            depth += 1
+            new = []
+            for p in generation:
+                for parent in p.parents():
+                    if parent is not None and parent.xref() not in ancestors:
+                        ancestors[parent.xref()] = (p, depth)
+                        new.append(parent)
+            if new != []:
+                queues.append([(0, a, a, None) for a in new])
+            generation = new
+
+        # descendants of all ancestors are searched together, so that
+        # relatives are reached through the shortest path first.
+        # queues[n] holds tuples (down, person, common ancestor,
+        # parent through which person was reached) of persons n steps
+        # away from self.
+        found = {}
+        n = 0
+        while n < len(queues):
+            queues[n].sort(key=lambda (down, person, a, parent): min(n - down, down))
+            for (down, person, ancestor, parent) in queues[n]:
+                if person.xref() in found:
+                    continue
+                found[person.xref()] = (person, ancestor, n - down, down, parent)
+                children = person.children()
+                if children != [] and n + 1 == len(queues):
+                    queues.append([])
+                for c in children:
+                    if c.xref() not in found:
+                        queues[n + 1].append((down + 1, c, ancestor, person))
+            queues[n] = None
+            n += 1
+
+        relationships = {}
+        for (person, ancestor, up, down, parent) in found.itervalues():
+            my_path = self._path_back(ancestors, ancestor, Individual.xref)
+            my_path.reverse()
+            his_path = [person]
+            while found[his_path[-1].xref()][4] is not None:
+                his_path.append(found[his_path[-1].xref()][4])
+            his_path.reverse()
+            relationships[person.xref()] = (person, ancestor, up, down,
+                                            self._path_steps(my_path, his_path))
+
+        relationships[self.xref()] = (self, self, 0, 0, [])
+        return relationships
+
+    def _paths_to_common_ancestor(self, relative):
+        """ Find paths through a common ancestor with a relative
+
+        Ancestors of self and relative are searched generation by
+        generation (as in common_ancestor()), until a generation in
+        which common ancestors are found.  Of those, the one with the
+        smallest sum of distances from self and relative is used.
+
+        Returns a tuple (my_path, his_path), where my_path is a list of
+        individuals from self up to the common ancestor, and his_path
+        is a list of individuals from the common ancestor down to
+        relative, or None if relative is not a relative of self.
+        """
 
-        if common_ancestor == relative:
-            his_path = []
-        else:
-            his_path = self.down_path(common_ancestor, relative, relative.distance_to_ancestor(common_ancestor))
+        graph = self._graph
+        if graph is None:
+            return self._search_common_ancestor(self, relative, lambda p: p.parents(), Individual.xref)
 
-        my_path.append(self)
-        his_path.append(relative)
+        paths = self._search_common_ancestor(graph.id(self), graph.id(relative), graph.parents_of, None)
+        if paths is None:
+            return None
+        return tuple([graph.individual(p) for p in path] for path in paths)
 
+    @staticmethod
+    def _search_common_ancestor(start, relative, parents, key):
+        """ Search for _paths_to_common_ancestor() through given
+        function parents, where key returns the key by which
+        individuals are remembered (individuals themselves if key is
+        None) """
+        if key is None:
+            key = lambda p: p
+
+        # ancestors are mapped to tuples (child through which they
+        # were reached, distance)
+        mine = {key(start): (None, 0)}
+        his = {key(relative): (None, 0)}
+        searches = [(mine, his, [start]), (his, mine, [relative])]
+
+        best = None # tuple (sum of distances, common ancestor)
+        depth = 0
+        while best is None:
+            depth += 1
+            searching = False
+            for (i, (seen, other, generation)) in enumerate(searches):
+                new = []
+                for p in generation:
+                    for parent in parents(p):
+                        if parent is None or key(parent) in seen:
+                            continue
+                        seen[key(parent)] = (p, depth)
+                        new.append(parent)
+                        if key(parent) in other:
+                            distance = depth + other[key(parent)][1]
+                            if best is None or distance < best[0]:
+                                best = (distance, parent)
+                searches[i] = (seen, other, new)
+                searching = searching or new != []
+            if not searching:
+                break
+
+        if best is None:
+            return None
+
+        ancestor = best[1]
+        my_path = Individual._path_back(mine, ancestor, key)
         my_path.reverse()
+        return (my_path, Individual._path_back(his, ancestor, key))
 
-        full_path = []
-        for step in my_path[:-1]: #my path without common ancestor
-            full_path.append([step, 'parent'])
+    @staticmethod
+    def _path_steps(my_path, his_path):
+        """ Return path from the first member of my_path to the last
+        member of his_path (as returned by path_to_relative()), where
+        my_path goes up from self to a common ancestor, and his_path
+        goes down from that common ancestor to a relative. """
+        full_path = [(my_path[0], 'start')]
+        for step in my_path[1:-1]: #my path without self and common ancestor
+            full_path.append((step, 'parent'))
 
         # if two children of common ancestor are siblings, then leave
         # out common ancestor
-        try:
-            if full_path[-1][0].is_sibling(his_path[1]):
-                full_path[-1][1] = 'sibling'
-            else: # children of common ancestor are half-siblings, so
-                  # we won't leave common ancestor out
-                full_path.append([common_ancestor, 'child'])
-        except IndexError: # sibling check didn't work out, we'll just
-                           # put common ancestor in there
-            full_path.append([common_ancestor, 'child'])
-        
-        for step in his_path[1:]: #his path without common ancestor
-            full_path.append([step, 'child'])
-        full_path[-1][1] = '' # last person doesn't have next person to relate to
-            
+        if len(my_path) > 1 and len(his_path) > 1 and my_path[-2].is_sibling(his_path[1]):
+            full_path.append((his_path[1], 'sibling'))
+            his_path = his_path[2:]
+        else:
+            if len(my_path) > 1:
+                full_path.append((my_path[-1], 'parent'))
+            his_path = his_path[1:]
+
+        for step in his_path: #rest of his path down to relative
+            full_path.append((step, 'child'))
+
         return full_path
-        
+
+    @staticmethod
+    def _path_back(previous, person, key):
+        """ Return list of individuals from person back to the start of
+        a search, where previous maps key(individual) of each
+        individual to a tuple (individual from which it was reached,
+        distance). """
+        path = [person]
+        while previous[key(person)][0] is not None:
+            person = previous[key(person)][0]
+            path.append(person)
+
+        return path
+
 
 class Family(Record):
     """ Gedcom record representing a family
@@ -585,14 +965,53 @@ class Family(Record):
 
     """
 
+    __slots__ = ('_members', '_husband', '_wife', '_children',
+                 '_marriage_events', '_other_events')
+
     def __init__(self,level,xref,tag,value,dict):
         Record.__init__(self,level,xref,tag,value,dict)
+        self._members = False
+        self._marriage_events = None
+        self._other_events = None
+
+    # Events are parsed the first time they are accessed, unless they
+    # were assigned before
+
+    @property
+    def marriage_events(self):
+        """ List of marriage events """
+        if self._marriage_events is None:
+            self._marriage_events = self._parse_generic_event_list("MARR")
+        return self._marriage_events
+
+    @marriage_events.setter
+    def marriage_events(self, events):
+        self._marriage_events = events
+
+    @property
+    def other_events(self):
+        """ List of all other events """
+        if self._other_events is None:
+            self._other_events = []
+            for event_type in ["ANUL", "CENS", "DIV", "DIVF", "ENGA", "MARB",
+                               "MARC", "MARL", "MARS", "EVEN"]:
+                self._other_events.extend(self._parse_generic_event_list(event_type))
+        return self._other_events
+
+    @other_events.setter
+    def other_events(self, events):
+        self._other_events = events
+
+    def _init_members(self):
+        """ Initialise husband, wife and children attributes.
+
+        Members are looked up on first use, so that records of lazily
+        parsed files are not parsed before they are needed, and that
+        no work is done for families which are never accessed. """
+
+        if self._members:
+            return
 
-    def _init(self):
-        """ Implementing Line._init()
-
-        Initialise husband, wife and children attributes. """
-        
         try:
             self._husband = self.children_tag_records("HUSB")[0]
         except IndexError:
@@ -608,26 +1027,25 @@ class Family(Record):
         except IndexError:
             self._children = []
 
-        self.marriage_events = self._parse_generic_event_list("MARR")
-        self.other_events = []
-        for event_type in ["ANUL", "CENS", "DIV", "DIVF", "ENGA", "MARB",
-                           "MARC", "MARL", "MARS", "EVEN"]:
-            self.other_events.extend(self._parse_generic_event_list(event_type))
+        self._members = True
 
     def husband(self):
         """ Return husband this family """
+        self._init_members()
         return self._husband
 
     def wife(self):
         """ Return wife this family """
+        self._init_members()
         return self._wife
 
     def parents(self):
         """ Return list of parents in this family """
-        return [self._husband, self._wife]
+        return [self.husband(), self.wife()]
 
     def children(self):
         """ Return list of children in this family """
+        self._init_members()
         return self._children
 
     def married(self):
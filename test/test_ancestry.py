@@ -0,0 +1,63 @@
+import unittest
+import os
+from gedcom import *
+
+class McIntyreTest(unittest.TestCase):
+    """Unit tests for ancestry.py using mcintyre.ged."""
+
+    def setUp(self):
+        self.g = Gedcom(os.path.abspath('test/mcintyre.ged'))
+        self.index = self.g.ancestry_index()
+
+    def test_ancestry_index(self):
+        """Testing class AncestryIndex"""
+        index = self.index
+        self.assertTrue(self.g.ancestry_index() is index)
+
+        mary = self.g.get_individual('@P405366386@')
+        marys_husband = self.g.get_individual('@P405364205@')
+        chris = self.g.get_individual('@P405749335@')
+        barbara = self.g.get_individual('@P407946950@')
+        marsha = self.g.get_individual('@P405342543@')
+        will = self.g.get_individual('@P407996928@')
+
+        self.assertTrue(index.is_ancestor(mary, chris))
+        self.assertTrue(index.is_ancestor(chris, chris))
+        self.assertFalse(index.is_ancestor(chris, mary))
+
+        self.assertTrue(index.is_relative(barbara, chris))
+        self.assertFalse(index.is_relative(barbara, will))
+        self.assertTrue(index.is_relative(chris, will))
+        self.assertFalse(index.is_relative(chris, None))
+
+        self.assertEqual(index.common_ancestor(mary, mary), mary)
+        self.assertEqual(index.common_ancestor(mary, mary.father()), mary.father())
+        self.assertTrue(index.common_ancestor(chris, barbara) in [mary, marys_husband])
+        self.assertEqual(index.common_ancestor(barbara, will), None)
+
+        self.assertEqual(index.distance_to_ancestor(barbara, mary), 1)
+        self.assertEqual(index.distance_to_ancestor(chris, mary), 3)
+        self.assertEqual(index.distance_to_ancestor(mary, chris), None)
+
+        self.assertTrue(mary in index.ancestors(chris))
+        self.assertFalse(chris in index.ancestors(chris))
+        self.assertEqual(sorted(index.common_ancestors(marsha, barbara)),
+                         sorted(index.ancestors(marsha)))
+
+    def test_same_as_individual(self):
+        """Testing that AncestryIndex agrees with Individual methods"""
+        individuals = self.g.individual_list()
+        for a in individuals:
+            ancestors = dict(a.iter_ancestors())
+            self.assertEqual(sorted(self.index.ancestors(a)), sorted(ancestors.keys()))
+            for (p, distance) in ancestors.items():
+                self.assertTrue(self.index.is_ancestor(p, a))
+                self.assertEqual(self.index.distance_to_ancestor(a, p), distance)
+        for a in individuals[::7]:
+            for b in individuals[::5]:
+                self.assertEqual(self.index.is_relative(a, b), a.is_relative(b))
+                self.assertEqual(sorted(self.index.lowest_common_ancestors(a, b)),
+                                 sorted(a.lowest_common_ancestors(b)))
+
+if __name__ == '__main__':
+    unittest.main()
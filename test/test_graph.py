@@ -0,0 +1,215 @@
+import unittest
+import gc
+import os
+from gedcom import *
+
+class WrightTest(unittest.TestCase):
+    """Unit tests for graph.py using wright.ged."""
+
+    def setUp(self):
+        self.g = Gedcom(os.path.abspath('test/wright.ged'))
+        self.graph = self.g.graph()
+
+    def xrefs(self, ids):
+        return [self.graph.individual(i).xref() for i in ids]
+
+    def test_edges(self):
+        """Testing edges of FamilyGraph"""
+        graph = self.graph
+        self.assertTrue(self.g.graph() is graph)
+        self.assertEqual(len(graph), len(self.g.individual_list()))
+        self.assertEqual(graph.family_count(), len(self.g.family_list()))
+
+        # records of a file without a graph, whose parents() and
+        # children() don't follow the graph
+        records = Gedcom(os.path.abspath('test/wright.ged'))
+        for individual in self.g.individual_list():
+            i = graph.id(individual)
+            self.assertEqual(graph.individual(i), individual)
+            record = records.get_individual(individual.xref())
+            self.assertEqual(self.xrefs(graph.parents_of(i)),
+                             [p.xref() for p in record.parents() if p is not None])
+            self.assertEqual(self.xrefs(graph.children_of(i)),
+                             [c.xref() for c in record.children()])
+            self.assertEqual([graph.family(f) for f in graph.families_of(i)],
+                             individual.families())
+            self.assertEqual([graph.family(f) for f in graph.parent_families_of(i)],
+                             individual.parent_families())
+
+        for family in self.g.family_list():
+            f = graph.family_id(family)
+            self.assertEqual(self.xrefs(graph.family_children_of(f)),
+                             [c.xref() for c in family.children()])
+            if family.husband() is None:
+                self.assertEqual(graph.husbands[f], -1)
+            else:
+                self.assertEqual(graph.husbands[f], graph.id(family.husband()))
+
+        family = self.g.get_family('@F1@')
+        husband = graph.id(family.husband())
+        wife = graph.id(family.wife())
+        self.assertTrue(wife in graph.spouses_of(husband))
+        self.assertTrue(husband in graph.spouses_of(wife))
+        self.assertFalse(husband in graph.spouses_of(husband))
+
+    def test_traversal(self):
+        """Testing traversal of FamilyGraph"""
+        graph = self.graph
+        for individual in self.g.individual_list()[::9]:
+            i = graph.id(individual)
+
+            ancestors = graph.ancestors(i)
+            self.assertEqual(sorted((graph.individual(a).xref(), d) for (a, d) in ancestors.items()),
+                             sorted((x, d) for (x, (a, d)) in individual._ancestor_distances().items()))
+            for (d, distance) in graph.descendants(i).items():
+                if d != i:
+                    path = individual.down_path(individual, graph.individual(d))
+                    self.assertEqual(len(path), distance)
+
+            relationships = individual.relationships()
+            found = graph.relationships(i)
+            self.assertEqual(sorted(self.xrefs(found)), sorted(relationships))
+            for (j, (a, up, down)) in found.items():
+                (relative, ancestor, my_up, my_down, path) = relationships[graph.individual(j).xref()]
+                self.assertEqual(up + down, my_up + my_down)
+
+    def test_records(self):
+        """Testing that individuals follow the graph once it is attached"""
+        records = Gedcom(os.path.abspath('test/wright.ged'))
+        records.kinship()
+        records.ancestry_index()
+        self.assertTrue(self.g.attach_graph() is self.graph)
+        xrefs = lambda individuals: [None if e is None else e.xref() for e in individuals]
+        individuals = self.g.individual_list()
+        for individual in individuals:
+            self.assertTrue(individual._graph is self.graph)
+            record = records.get_individual(individual.xref())
+            self.assertTrue(record._graph is None)
+            self.assertEqual(xrefs(individual.parents()), xrefs(record.parents()))
+            self.assertEqual(xrefs(individual.children()), xrefs(record.children()))
+
+        for a in individuals[::7]:
+            for b in individuals[::5]:
+                (x, y) = (records.get_individual(a.xref()), records.get_individual(b.xref()))
+                self.assertEqual(xrefs(a.down_path(a, b) or []), xrefs(x.down_path(x, y) or []))
+                self.assertEqual(xrefs(a.down_path(a, b, 2) or []), xrefs(x.down_path(x, y, 2) or []))
+                path = a.path_to_relative(b)
+                if path is None:
+                    self.assertEqual(x.path_to_relative(y), None)
+                else:
+                    self.assertEqual([(e.xref(), r) for (e, r) in path],
+                                     [(e.xref(), r) for (e, r) in x.path_to_relative(y)])
+
+    def test_columns(self):
+        """Testing FamilyGraph of a Gedcom file stored in columns"""
+        g = Gedcom(os.path.abspath('test/wright.ged'), columns=True)
+        graph = g.graph()
+        self.assertEqual(len(graph), len(self.graph))
+        # records aren't kept by the graph (lines of a record refer to
+        # each other, so they are freed by the garbage collector)
+        gc.collect()
+        self.assertEqual(len(g.record_dict()._records), 0)
+
+        self.assertEqual(graph.individual(0)._graph, None)
+        self.assertTrue(g.attach_graph() is graph)
+        gc.collect()
+        self.assertEqual(len(g.record_dict()._records), 0)
+        # records created later follow the graph
+        individual = g.get_individual('@I3@')
+        self.assertTrue(individual._graph is graph)
+        self.assertEqual([e.xref() for e in individual.children()],
+                         [e.xref() for e in self.g.get_individual('@I3@').children()])
+
+    def test_components(self):
+        """Testing connected components of FamilyGraph"""
+        graph = self.graph
+        sizes = graph.component_sizes()
+        self.assertEqual(sum(sizes), len(graph))
+
+        for family in self.g.family_list():
+            members = [m for m in family.parents() + family.children() if m is not None]
+            for m in members:
+                self.assertTrue(graph.connected(graph.id(members[0]), graph.id(m)))
+
+        counts = [0] * len(sizes)
+        for i in xrange(len(graph)):
+            counts[graph.component(i)] += 1
+        self.assertEqual(counts, sizes)
+
+        individuals = self.g.individual_list()
+        for a in individuals[::17]:
+            for b in individuals[::13]:
+                path = a.path_to_relative(b, graph)
+                self.assertEqual(path, a.path_to_relative(b))
+                if not graph.connected(graph.id(a), graph.id(b)):
+                    self.assertEqual(path, None)
+
+    def test_generations(self):
+        """Testing generations of FamilyGraph"""
+        graph = self.graph
+        order = graph.topological_order()
+        self.assertEqual(sorted(order), range(len(graph)))
+        position = dict((i, n) for (n, i) in enumerate(order))
+        generations = graph.generations()
+        for i in xrange(len(graph)):
+            for p in graph.parents_of(i):
+                self.assertTrue(position[p] < position[i])
+                self.assertTrue(generations[p] < generations[i])
+            if len(graph.parents_of(i)) == 0:
+                self.assertEqual(generations[i], 0)
+            else:
+                self.assertEqual(generations[i], 1 + max([generations[p] for p in graph.parents_of(i)]))
+
+        delores = self.g.get_individual('@I294@')
+        i = graph.id(delores)
+        relative = graph.generations_from(i)
+        self.assertEqual(relative[i], 0)
+        self.assertEqual(relative[graph.id(delores.father())], 1)
+        for c in delores.children():
+            self.assertEqual(relative[graph.id(c)], -1)
+
+    def test_counts(self):
+        """Testing ancestor and descendant counts of FamilyGraph"""
+        graph = self.graph
+        ancestors = graph.ancestor_counts()
+        descendants = graph.descendant_counts()
+        for i in xrange(len(graph)):
+            individual = graph.individual(i)
+            self.assertEqual(ancestors[i], len(list(individual.iter_ancestors())))
+            self.assertEqual(descendants[i], len(list(individual.iter_descendants())))
+
+        self.assertEqual(list(graph.ancestor_counts(1000)), list(ancestors))
+        self.assertEqual(list(graph.descendant_counts(1000)), list(descendants))
+
+        # relative standard error of estimates is about 1/sqrt(k - 2),
+        # and estimates are reproducible, so errors of this file are
+        # known to stay within these bounds (no individual of this
+        # file has 16 ancestors, so ancestors are estimated with k = 8)
+        for (counts, exact, sizes) in [(graph.ancestor_counts, ancestors, [8]),
+                                       (graph.descendant_counts, descendants, [8, 16])]:
+            for k in sizes:
+                estimates = counts(k)
+                errors = []
+                for i in xrange(len(graph)):
+                    if exact[i] < k:
+                        self.assertEqual(estimates[i], exact[i])
+                    else:
+                        errors.append(abs(estimates[i] - exact[i]) / float(exact[i]))
+                self.assertTrue(errors != [])
+                self.assertTrue(max(errors) < 2.0 / (k - 2) ** 0.5)
+                self.assertTrue((sum([e * e for e in errors]) / len(errors)) ** 0.5 < 1.0 / (k - 2) ** 0.5)
+
+    def test_cycle(self):
+        """Testing detection of individuals who are their own ancestors"""
+        # a man who is his own grandfather
+        g = Gedcom(os.path.abspath('test/cycle.ged'))
+
+        for count in [g.graph().generations, g.graph().descendant_counts]:
+            try:
+                count()
+                self.fail("CycleError not raised")
+            except CycleError, e:
+                self.assertEqual(sorted([x.xref() for x in e.individuals]), ['@I1@', '@I2@', '@I3@'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import unittest
+import os
+from gedcom import *
+
+class McIntyreTest(unittest.TestCase):
+    """Unit tests for kinship.py using mcintyre.ged."""
+
+    def setUp(self):
+        self.g = Gedcom(os.path.abspath('test/mcintyre.ged'))
+        self.kinship = self.g.kinship()
+
+    def test_kinship(self):
+        """Testing class Kinship"""
+        kinship = self.kinship
+        self.assertTrue(self.g.kinship() is kinship)
+
+        mary = self.g.get_individual('@P405366386@')
+        chris = self.g.get_individual('@P405749335@')
+        barbara = self.g.get_individual('@P407946950@')
+        marsha = self.g.get_individual('@P405342543@')
+        kimberly = self.g.get_individual('@P405313470@')
+        will = self.g.get_individual('@P407996928@')
+
+        self.assertEqual(kinship.kinship(mary, mary), 0.5)
+        self.assertEqual(kinship.kinship(mary, marsha), 0.25)
+        self.assertEqual(kinship.relationship(mary, marsha), 0.5)
+        self.assertEqual(kinship.relationship(marsha, barbara), 0.5)
+        self.assertEqual(kinship.relationship(kimberly, mary), 0.25)
+        self.assertEqual(kinship.relationship(chris, barbara), 0.125)
+        self.assertEqual(kinship.relationship(barbara, will), 0.0)
+        self.assertEqual(kinship.inbreeding(chris), 0.0)
+
+        individuals = [mary, chris, barbara, marsha]
+        matrix = kinship.matrix(individuals)
+        for (n, a) in enumerate(individuals):
+            for (m, b) in enumerate(individuals):
+                self.assertEqual(matrix[n][m], kinship.kinship(a, b))
+                self.assertEqual(matrix[n][m], matrix[m][n])
+
+    def test_inbreeding(self):
+        """Testing Kinship with pedigree collapse"""
+        # brother and sister, whose son marries his half-sister
+        g = Gedcom(os.path.abspath('test/inbred.ged'))
+
+        kinship = g.kinship()
+        (brother, sister, son, half_sister, child) = [g.get_individual(x) for x in
+                                                      ['@I3@', '@I4@', '@I5@', '@I7@', '@I8@']]
+        self.assertEqual(kinship.inbreeding(son), 0.25)
+        self.assertEqual(kinship.kinship(son, son), 0.625)
+        # son and half-sister share a mother, who is also their aunt
+        self.assertEqual(kinship.kinship(son, half_sister), 0.1875)
+        self.assertEqual(kinship.inbreeding(child), 0.1875)
+        self.assertEqual(kinship.kinship(brother, sister), 0.25)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 import os
 from gedcom import *
+import matches
 from matches import *
 
 class McIntyreTest(unittest.TestCase):
@@ -52,6 +53,21 @@ class McIntyreTest(unittest.TestCase):
         individual = results[0]
         self.assertEqual(individual.xref(), '@P405538002@')
 
+    def test_matchlist_indexes(self):
+        """ Testing indexes of MatchList after changes of its list """
+        individual = self.g.get_individual('@P405538002@')
+        m = MatchList(list(self.g.individual_list()))
+        m.birth_year_match(1904)
+        index = m.name_index()
+        self.assertTrue(m.name_index() is index)
+        m.records.remove(individual)
+        self.assertEqual(m.birth_year_match(1904), [])
+        self.assertFalse(m.name_index() is index)
+        m.records = [individual]
+        self.assertEqual(m.birth_year_match(1904), [individual])
+        self.assertEqual(m.year_index().records, [individual])
+        self.assertEqual(m.criteria_match('surname=McIntyre'), [])
+
     def test_criteria(self):
         """ Testing criteria search """
 
@@ -77,6 +93,94 @@ class McIntyreTest(unittest.TestCase):
         self.assertEqual(len(result), 1)
         self.assertEqual(result[0].name(), ('John M', 'McIntyre'))
 
+    def test_compile_criteria(self):
+        """ Testing compiled criteria """
+        self.assertEqual(compile_criteria("surname=McIntyre:birthrange=1820-1840:foo=bar"),
+                         [('surname_match', ('McIntyre',)), ('birth_range_match', (1820, 1840))])
+        self.assertEqual(compile_criteria("birth=abc"), None)
+        self.assertEqual(compile_criteria("birthrange=1820"), None)
+        self.assertEqual(compile_criteria("surname"), None)
+
+        m = MatchList(self.g.individual_list())
+        criteria = compile_criteria("surname=McIntyre:birth=1890:death=1953")
+        self.assertEqual(m.criteria_match(criteria), m.criteria_match("surname=McIntyre:birth=1890:death=1953"))
+        self.assertEqual(m.criteria_match("birth=abc"), [])
+        self.assertEqual(m.criteria_match("foo=bar"), self.g.individual_list())
+
+        for individual in self.g.individual_list():
+            self.assertEqual(MatchIndividual(individual).criteria_match(criteria),
+                             individual in m.criteria_match(criteria))
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed")
+    def test_table(self):
+        """ Testing class IndividualTable """
+        individuals = self.g.individual_list()
+        table = IndividualTable(individuals)
+        m = MatchList(individuals)
+        self.assertTrue(m.table() is m.table())
+
+        self.assertEqual(table.birth_year_match(1904)[0].xref(), '@P405538002@')
+        self.assertEqual([e.name() for e in table.marriage_range_match(1820, 1825)],
+                         [e.name() for e in m.marriage_range_match(1820, 1825)])
+
+        for criteria in ["surname=McIntyre:birthrange=1820-1840:deathrange=1865-1870",
+                         "surname=McIntyre:birth=1890:death=1953",
+                         "marriage=1821", "marriagerange=1820-1825:name=John",
+                         "birthrange=1900-1950:deathrange=1970-1990", "birth=abc"]:
+            expected = [e for e in individuals if MatchIndividual(e).criteria_match(criteria)]
+            self.assertEqual(table.criteria_match(criteria), expected)
+            self.assertEqual(m.criteria_match(criteria), expected)
+
+    def test_year_index(self):
+        """ Testing class YearIndex """
+        individuals = self.g.individual_list()
+        index = YearIndex(individuals)
+
+        self.assertEqual(index.birth_year_match(1904)[0].xref(), '@P405538002@')
+        self.assertEqual(index.birth_range_match(1810, 1800), [])
+        self.assertEqual(index.count("birth_year_match", 1904), 1)
+        for (method, args) in [("birth_year_match", (1819,)), ("birth_range_match", (1800, 1850)),
+                               ("death_year_match", (1979,)), ("death_range_match", (1970, 1980)),
+                               ("marriage_year_match", (1821,)), ("marriage_range_match", (1820, 1900))]:
+            self.assertEqual(getattr(index, method)(*args),
+                             [e for e in individuals if getattr(MatchIndividual(e), method)(*args)])
+
+        # without NumPy, MatchList answers year criteria from the index
+        saved = matches.numpy
+        matches.numpy = None
+        try:
+            m = MatchList(individuals)
+            self.assertEqual(m.birth_range_match(1800, 1850), index.birth_range_match(1800, 1850))
+            for criteria in ["surname=McIntyre:birthrange=1820-1840:deathrange=1865-1870",
+                             "surname=McIntyre:birth=1890:death=1953",
+                             "marriage=1821", "marriagerange=1820-1825:name=John",
+                             "birthrange=1900-1950:deathrange=1970-1990", "birth=abc"]:
+                expected = [e for e in individuals if MatchIndividual(e).criteria_match(criteria)]
+                self.assertEqual(m.criteria_match(criteria), expected)
+            self.assertTrue(m.year_index() is m.year_index())
+        finally:
+            matches.numpy = saved
+
+
+class WrightTest(unittest.TestCase):
+    """Unit tests for matches.py using wright.ged."""
+
+    def setUp(self):
+        self.g = Gedcom(os.path.abspath('test/wright.ged'))
+
+    def test_bad_marriage_date(self):
+        """ Testing criteria with a marriage date which doesn't end with a year """
+        pearline = self.g.get_individual('@I160@') # married '25 DEC 1963' and 'ABT 7 JUL'
+        self.assertFalse(MatchIndividual(pearline).criteria_match("marriage=1963"))
+        self.assertFalse(MatchIndividual(pearline).criteria_match(compile_criteria("marriagerange=1900-2000")))
+
+        m = MatchList(self.g.individual_list())
+        self.assertEqual(m.criteria_match("marriage=1821"), [])
+        self.assertFalse(pearline in m.criteria_match("marriage=1963"))
+        criteria = "marriagerange=1960-1965"
+        self.assertEqual(m.criteria_match(criteria),
+                         [e for e in self.g.individual_list() if MatchIndividual(e).criteria_match(criteria)])
+
 
 if __name__ == '__main__':
     unittest.main()
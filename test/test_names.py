@@ -0,0 +1,82 @@
+import unittest
+import os
+from gedcom import *
+from matches import *
+from names import *
+
+class McIntyreTest(unittest.TestCase):
+    """Unit tests for names.py using mcintyre.ged."""
+
+    def setUp(self):
+        self.g = Gedcom(os.path.abspath('test/mcintyre.ged'))
+        self.individuals = self.g.individual_list()
+        self.index = NameIndex(self.individuals)
+
+    def test_name_index(self):
+        """Testing class NameIndex"""
+        index = self.index
+
+        self.assertEqual([e.given_name() for e in index.surname_match('Merriman')], ['Lucy'])
+        self.assertEqual([e.surname() for e in index.given_match('Archibald')], ['McIntyre'])
+        self.assertEqual(index.surname_exact('McIntyre'),
+                         [e for e in self.individuals if e.surname() == 'McIntyre'])
+        self.assertEqual(index.surname_exact('Intyre'), [])
+        self.assertEqual(index.surname_prefix('Mc'),
+                         [e for e in self.individuals if e.surname().startswith('Mc')])
+        self.assertEqual(index.given_prefix('Mary'),
+                         [e for e in self.individuals if e.given_name().startswith('Mary')])
+        self.assertEqual(index.given_exact('Mary Christine'), [self.g.get_individual('@P405366386@')])
+
+    def test_same_as_match(self):
+        """Testing that NameIndex finds the same individuals as MatchIndividual"""
+        names = [''] + [e.surname() for e in self.individuals] + [e.given_name() for e in self.individuals]
+        queries = set()
+        for name in names:
+            for i in range(len(name) + 1):
+                queries.add(name[i:i + 1])
+                queries.add(name[i:i + 2])
+                queries.add(name[i:i + 4])
+        queries.add('xyz')
+
+        m = MatchList(self.individuals)
+        for query in queries:
+            self.assertEqual(self.index.surname_match(query),
+                             [e for e in self.individuals if MatchIndividual(e).surname_match(query)])
+            self.assertEqual(m.given_match(query),
+                             [e for e in self.individuals if MatchIndividual(e).given_match(query)])
+
+    def test_phonetic_codes(self):
+        """Testing soundex, daitch_mokotoff and phonetic_codes"""
+        self.assertEqual(soundex('McIntyre'), 'M253')
+        self.assertEqual(soundex('MacIntyre'), 'M253')
+        self.assertEqual(soundex('Ashcraft'), 'A261')
+        self.assertEqual(soundex('Lee'), 'L000')
+        self.assertEqual(soundex(''), '')
+        self.assertEqual(daitch_mokotoff('Moskowitz'), ['645740'])
+        self.assertEqual(daitch_mokotoff('Auerbach'), ['097400', '097500'])
+        self.assertEqual(daitch_mokotoff('Peters'), ['734000', '739400'])
+        self.assertEqual(daitch_mokotoff('Kleinman'), ['586660'])
+        self.assertEqual(phonetic_codes('Mary Christine'), set(['M600', 'C623']))
+        self.assertEqual(phonetic_codes(None), set())
+
+    def test_phonetic_match(self):
+        """Testing phonetic name methods and criteria"""
+        mcintyres = [e for e in self.individuals if e.surname() == 'McIntyre']
+        self.assertEqual(self.index.surname_soundex_match('MacIntyre'), mcintyres)
+        self.assertEqual(self.index.surname_dm_match('Macintyre'), mcintyres)
+
+        m = MatchList(self.individuals)
+        for query in ['MacIntyre', 'Hearn', 'Marie', 'Robert', 'Smyth', 'xyz']:
+            for method in ['surname_soundex_match', 'given_soundex_match',
+                           'surname_dm_match', 'given_dm_match']:
+                self.assertEqual(getattr(m, method)(query),
+                                 [e for e in self.individuals if getattr(MatchIndividual(e), method)(query)])
+
+        self.assertEqual(m.criteria_match('soundex=MacIntyre'), mcintyres)
+        criteria = 'soundex=Hearn:namedmsoundex=Marie:birthrange=1900-1950'
+        self.assertEqual(m.criteria_match(criteria),
+                         [e for e in self.individuals if MatchIndividual(e).criteria_match(criteria)])
+        self.assertTrue(self.g.get_individual('@P405366386@') in m.criteria_match(criteria))
+
+if __name__ == '__main__':
+    unittest.main()
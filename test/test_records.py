@@ -87,6 +87,99 @@ class McIntyreTest(unittest.TestCase):
         
         self.assertEqual(map(lambda (x, y): (x.xref(), y), barbara.path_to_relative(chris)), [('@P407946950@', 'start'), ('@P405342543@', 'sibling'), ('@P405313470@', 'child'), ('@P405749335@', 'child')])
 
+    def test_lowest_common_ancestors(self):
+        """Testing Individual.lowest_common_ancestors"""
+        mary = self.g.get_individual('@P405366386@')
+        marys_husband = self.g.get_individual('@P405364205@')
+        chris = self.g.get_individual('@P405749335@')
+        barbara = self.g.get_individual('@P407946950@')
+        marsha = self.g.get_individual('@P405342543@')
+        will = self.g.get_individual('@P407996928@')
+
+        lowest = chris.lowest_common_ancestors(barbara)
+        self.assertEqual(sorted([(a.xref(), d1, d2) for (a, d1, d2) in lowest]),
+                         sorted([(mary.xref(), 3, 1), (marys_husband.xref(), 3, 1)]))
+
+        lowest = marsha.lowest_common_ancestors(barbara)
+        self.assertEqual(sorted([(a.xref(), d1, d2) for (a, d1, d2) in lowest]),
+                         sorted([(mary.xref(), 1, 1), (marys_husband.xref(), 1, 1)]))
+
+        self.assertEqual([(a, d1, d2) for (a, d1, d2) in chris.lowest_common_ancestors(marsha)], [(marsha, 2, 0)])
+        self.assertEqual(barbara.lowest_common_ancestors(will), [])
+        self.assertEqual(mary.lowest_common_ancestors(mary), [(mary, 0, 0)])
+
+    def test_iter_ancestors(self):
+        """Testing Individual.iter_ancestors and iter_descendants"""
+        mary = self.g.get_individual('@P405366386@')
+        chris = self.g.get_individual('@P405749335@')
+        marsha = self.g.get_individual('@P405342543@')
+        kimberly = self.g.get_individual('@P405313470@')
+
+        ancestors = list(chris.iter_ancestors())
+        self.assertTrue((kimberly, 1) in ancestors)
+        self.assertTrue((marsha, 2) in ancestors)
+        self.assertTrue((mary, 3) in ancestors)
+        self.assertEqual(len(ancestors), len(set([a.xref() for (a, g) in ancestors])))
+        self.assertEqual([g for (a, g) in ancestors], sorted([g for (a, g) in ancestors]))
+        for (a, g) in ancestors:
+            self.assertEqual(chris.distance_to_ancestor(a), g)
+
+        self.assertEqual(list(chris.iter_ancestors(2)), [(a, g) for (a, g) in ancestors if g <= 2])
+        self.assertEqual(list(chris.iter_ancestors(0)), [])
+
+        descendants = list(mary.iter_descendants())
+        self.assertTrue((marsha, 1) in descendants)
+        self.assertTrue((chris, 3) in descendants)
+        self.assertEqual(list(mary.iter_descendants(1)), [(c, 1) for c in mary.children()])
+
+    def test_relationships(self):
+        """Testing Individual.relationships"""
+        mary = self.g.get_individual('@P405366386@')
+        chris = self.g.get_individual('@P405749335@')
+        barbara = self.g.get_individual('@P407946950@')
+        will = self.g.get_individual('@P407996928@')
+
+        relationships = chris.relationships()
+        self.assertEqual(relationships[chris.xref()], (chris, chris, 0, 0, []))
+        self.assertTrue(will.xref() in relationships)
+        self.assertFalse(will.xref() in barbara.relationships())
+
+        (relative, ancestor, up, down, path) = relationships[barbara.xref()]
+        self.assertEqual(relative, barbara)
+        self.assertTrue(ancestor in [mary, mary.families()[0].husband()])
+        self.assertEqual((up, down), (3, 1))
+        self.assertEqual(path, chris.path_to_relative(barbara))
+
+        for individual in self.g.individual_list():
+            if individual.xref() in relationships and individual != chris:
+                path = relationships[individual.xref()][4]
+                self.assertEqual(path, chris.path_to_relative(individual))
+
+    def test_init_hook(self):
+        """Testing that parser runs Line._init() and that events can be assigned"""
+        calls = []
+        saved = Line.__dict__['_init']
+        Line._init = lambda line: calls.append(line)
+        try:
+            g = Gedcom(os.path.abspath('test/mcintyre.ged'))
+            self.assertEqual(calls, g.line_list())
+
+            del calls[:]
+            lazy = Gedcom(os.path.abspath('test/mcintyre.ged'), lazy=True)
+            mary = lazy.get_individual('@P405366386@')
+            self.assertTrue(mary in calls)
+            self.assertTrue(mary.children_tags('BIRT')[0] in calls)
+        finally:
+            Line._init = saved
+
+        mary = self.g.get_individual('@P405366386@')
+        self.assertEqual(mary.birth().dateplace(), ('19 Nov 1923', 'Louisiana, USA'))
+        mary.birth_events = []
+        self.assertEqual(mary.birth(), None)
+        family = self.g.get_family('@F8@')
+        family.marriage_events = family.marriage_events[:0]
+        self.assertEqual(family.marriage_events, [])
+
     def test_spaces(self):
         """Testing indenting spaces"""
         ernest = self.g.get_individual('@P405362004@')
@@ -96,6 +189,33 @@ class McIntyreTest(unittest.TestCase):
         notes = ernest.children_tags('NOTE')
         self.assertEqual(len(notes), 1)
         self.assertEqual(notes[0].value(), '    Ma and Papa')
+
+    def test_tag_index(self):
+        """Testing that children_tags() sees lines added to children_lines()"""
+        mary = self.g.get_individual('@P405366386@')
+        notes = mary.children_tags('NOTE')
+        self.assertEqual(len(notes), 1)
+        self.assertEqual(mary.sex(), 'F')
+
+        mary.children_lines().append(Line(1, '', 'NOTE', 'first', self.g.record_dict()))
+        self.assertEqual(len(mary.children_tags('NOTE')), 2)
+        mary.children_lines().append(Line(1, '', 'NOTE', 'second', self.g.record_dict()))
+        self.assertEqual([e.value() for e in mary.children_tags('NOTE')[1:]], ['first', 'second'])
+
+        sex = mary.children_tags('SEX')[0]
+        mary.children_lines().remove(sex)
+        self.assertEqual(mary.sex(), None)
+
+    def test_leaf_lines(self):
+        """Testing that reading records doesn't give lists to lines without children"""
+        for e in self.g.individual_list():
+            e.name()
+            e.birth_events + e.death_events + e.other_events
+        for f in self.g.family_list():
+            f.marriage_events + f.other_events
+        for line in self.g.line_list():
+            if len(line._child_lines()) == 0:
+                self.assertEqual(line._children_lines, None)
        
 class WrightTest(unittest.TestCase):
     """Unit tests for records.py using wright.ged."""
@@ -1,5 +1,9 @@
 import unittest
 import os
+import marshal
+import shutil
+import tempfile
+import gedcom
 from gedcom import *
 
 
@@ -17,6 +21,30 @@ class McIntyreTest(unittest.TestCase):
         self.assertEqual(len(self.g.family_list()), 16)
               
 
+    def test_lines(self):
+        """Check that lines are parsed into compact Line objects which
+        reproduce the file"""
+        f = open(os.path.abspath('test/mcintyre.ged'))
+        expected = [line.decode("utf-8-sig").strip() for line in f if line.strip() != '']
+        f.close()
+        lines = self.g.line_list()
+        self.assertEqual([unicode(e) for e in lines], expected)
+
+        # no per-instance dictionaries, and a single copy of each tag
+        for e in lines:
+            self.assertFalse(hasattr(e, '__dict__'))
+        self.assertTrue(lines[1].tag() is [e for e in lines if e.tag() == 'CHAR'][-1].tag())
+        mary = self.g.get_individual('@P405366386@')
+        fams = [e for e in lines if e.value() == '@F4@']
+        self.assertTrue(fams[0].value() is fams[-1].value())
+
+        # lines without children still return a list
+        sex = mary.children_tags('SEX')[0]
+        self.assertEqual(sex.children_lines(), [])
+        self.assertTrue(isinstance(sex.children_lines(), list))
+        sex.children_lines().append(Line(2, '', 'NOTE', 'added', self.g.record_dict()))
+        self.assertEqual([e.value() for e in sex.children_lines()], ['added'])
+
     def test_missing_xref(self):
         """I don't really know what this does... (original author didn't bother to comment) """
         for e in self.g.line_list():
@@ -29,6 +57,226 @@ class McIntyreTest(unittest.TestCase):
             if e.xref() == "@I99@":
                 print e.name()
 
+    def test_tokenizer(self):
+        """Check if tokenizer gives the same results as step by step tokenizer"""
+        lines = [u'0 HEAD', u'0 @I1@ INDI\r\n', u'1 NOTE     Ma and Papa', u'1 NAME John /Smith/ ',
+                 u'2 DATE 1 JAN\r1900', u'0 @X@ @Y@ value', u'10 TAG', u'+1 TAG', u'0 @ TAG',
+                 u'', u'  ', u'0', u'x NAME', u'-1 NAME', u'0  HEAD', u'0 @X HEAD', u'0 @X@',
+                 u'0 @X@ ', u'0 @A@B TAG', u'1\tNAME']
+
+        def tokenize(method, line):
+            try:
+                return method(1, line)
+            except GedcomParseError as e:
+                return str(e)
+
+        for line in lines:
+            self.assertEqual(tokenize(gedcom._tokenize, line), tokenize(gedcom._tokenize_checked, line))
+
+    def test_iter_records(self):
+        """Check if streaming parser yields the same records as Gedcom"""
+        records = list(iter_records(os.path.abspath('test/mcintyre.ged')))
+        expected = [e for e in self.g.line_list() if e.level() == 0]
+
+        self.assertEqual([r.xref() for r in records], [r.xref() for r in expected])
+        self.assertEqual([r.gedcom() for r in records], [r.gedcom() for r in expected])
+
+        mary = [r for r in records if r.xref() == '@P405366386@'][0]
+        self.assertEqual(mary.type(), 'Individual')
+        self.assertEqual(mary.name(), ('Mary Christine', 'Hern'))
+        self.assertEqual(mary.birth().dateplace(), ('19 Nov 1923', 'Louisiana, USA'))
+        self.assertEqual(mary.families(), [])
+
+    def test_iter_records_memory(self):
+        """Check if streaming parser forgets records it handed out"""
+        stream = gedcom._RecordStream(os.path.abspath('test/wright.ged'))
+        (records, kept, strings) = (0, 0, 0)
+        for record in stream.records():
+            records += 1
+            kept = max(kept, len(stream._line_top.children_lines()))
+            strings = max(strings, len(stream._strings))
+
+        self.assertEqual(records, 543)
+        self.assertEqual(kept, 1)
+        # only strings of the record being read are shared
+        self.assertTrue(strings < 10)
+
+    def test_lazy(self):
+        """Check if lazily parsed Gedcom gives the same results as Gedcom"""
+        lazy = Gedcom(os.path.abspath('test/mcintyre.ged'), lazy=True)
+
+        self.assertEqual(len(lazy.record_dict()), 57)
+        self.assertEqual(sorted(lazy.record_dict().keys()), sorted(self.g.record_dict().keys()))
+
+        mary = lazy.get_individual('@P405366386@')
+        self.assertEqual(mary.name(), ('Mary Christine', 'Hern'))
+        self.assertEqual(mary.father().xref(), '@P405368888@')
+        self.assertEqual(mary.father().children(), [mary])
+        self.assertTrue(lazy.get_record('@P405368888@') is mary.father())
+
+        self.assertEqual([e.gedcom() for e in lazy.line_list()], [e.gedcom() for e in self.g.line_list()])
+        self.assertEqual([e.xref() for e in lazy.individual_list()], [e.xref() for e in self.g.individual_list()])
+        self.assertEqual([e.xref() for e in lazy.family_list()], [e.xref() for e in self.g.family_list()])
+
+    def test_lazy_options(self):
+        """Check if options which can't be used with lazy are refused"""
+        path = os.path.abspath('test/mcintyre.ged')
+        for options in [{'columns': True}, {'workers': 8}, {'snapshot': path + '.snapshot'}]:
+            self.assertRaises(ValueError, Gedcom, path, lazy=True, **options)
+        self.assertFalse(os.path.exists(path + '.snapshot'))
+
+    def test_columns(self):
+        """Check if Gedcom stored in columns gives the same results as Gedcom"""
+        g = Gedcom(os.path.abspath('test/mcintyre.ged'), columns=True)
+
+        self.assertEqual(len(g.line_list()), len(self.g.line_list()))
+        self.assertEqual([e.gedcom() for e in g.line_list()], [e.gedcom() for e in self.g.line_list()])
+        self.assertEqual(g.line_list()[-1].gedcom(), self.g.line_list()[-1].gedcom())
+        self.assertEqual([e.xref() for e in g.individual_list()], [e.xref() for e in self.g.individual_list()])
+        self.assertEqual([e.xref() for e in g.family_list()], [e.xref() for e in self.g.family_list()])
+        self.assertEqual(sorted(g.record_dict().keys()), sorted(self.g.record_dict().keys()))
+
+        mary = g.get_individual('@P405366386@')
+        self.assertEqual(mary.name(), ('Mary Christine', 'Hern'))
+        self.assertEqual(mary.father().children(), [mary])
+        self.assertEqual(mary.children_tags('SEX')[0].value(), 'F')
+        self.assertEqual([f.xref() for f in mary.children_tag_records('FAMS')], ['@F4@'])
+
+    def test_workers(self):
+        """Check if parallel parsing gives the same results as Gedcom"""
+        for workers in [2, 3, 100]:
+            g = Gedcom(os.path.abspath('test/mcintyre.ged'), workers=workers)
+
+            self.assertEqual([e.gedcom() for e in g.line_list()], [e.gedcom() for e in self.g.line_list()])
+            self.assertEqual([e.xref() for e in g.individual_list()], [e.xref() for e in self.g.individual_list()])
+            self.assertEqual([e.xref() for e in g.family_list()], [e.xref() for e in self.g.family_list()])
+            self.assertEqual(sorted(g.record_dict().keys()), sorted(self.g.record_dict().keys()))
+
+            mary = g.get_individual('@P405366386@')
+            self.assertEqual(mary.father().children(), [mary])
+            self.assertTrue(mary.father().parent_line() is g.line_list()[0].parent_line())
+
+            g = Gedcom(os.path.abspath('test/mcintyre.ged'), columns=True, workers=workers)
+            self.assertEqual([e.gedcom() for e in g.line_list()], [e.gedcom() for e in self.g.line_list()])
+            self.assertEqual([e.xref() for e in g.individual_list()], [e.xref() for e in self.g.individual_list()])
+            self.assertEqual(sorted(g.record_dict().keys()), sorted(self.g.record_dict().keys()))
+            self.assertEqual(g.get_individual('@P405366386@').father().xref(), '@P405368888@')
+
+        path = os.path.abspath('test/indented.ged')
+        self.assertEqual([e.gedcom() for e in Gedcom(path, workers=3).line_list()],
+                         [e.gedcom() for e in Gedcom(path).line_list()])
+
+    def test_snapshot(self):
+        """Check if Gedcom loaded from a snapshot is the same as parsed one"""
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'mcintyre.ged')
+            shutil.copy(os.path.abspath('test/mcintyre.ged'), path)
+            snapshot = os.path.join(tmp, 'mcintyre.snapshot')
+
+            Gedcom(path).save_snapshot(snapshot)
+            g = Gedcom.load_snapshot(snapshot)
+            self.assertEqual([e.gedcom() for e in g.line_list()], [e.gedcom() for e in self.g.line_list()])
+            self.assertEqual([e.xref() for e in g.individual_list()], [e.xref() for e in self.g.individual_list()])
+            mary = g.get_individual('@P405366386@')
+            self.assertEqual(mary.father().children(), [mary])
+            self.assertEqual(mary.birth().dateplace(), ('19 Nov 1923', 'Louisiana, USA'))
+            self.assertTrue(g.get_record('@F4@') is mary.families()[0])
+
+            # column store loaded from the snapshot
+            g = Gedcom(path, snapshot=snapshot, columns=True)
+            self.assertEqual([e.gedcom() for e in g.line_list()], [e.gedcom() for e in self.g.line_list()])
+            self.assertEqual(sorted(g.record_dict().keys()), sorted(self.g.record_dict().keys()))
+            self.assertEqual(g.get_individual('@P405366386@').father().children()[0].xref(), '@P405366386@')
+
+            # values which aren't ASCII
+            utf8 = os.path.join(tmp, 'utf-8.ged')
+            shutil.copy(os.path.abspath('test/TGC55CLF.utf-8.ged'), utf8)
+            expected = [e.gedcom() for e in Gedcom(utf8, snapshot=snapshot + '.utf-8').line_list()]
+            for columns in [False, True]:
+                g = Gedcom(utf8, snapshot=snapshot + '.utf-8', columns=columns)
+                self.assertEqual([e.gedcom() for e in g.line_list()], expected)
+
+            # touched, but unchanged file
+            os.utime(path, (0, 0))
+            self.assertTrue(Gedcom(path)._load_snapshot(snapshot))
+
+            # changed file
+            f = open(path, 'a')
+            f.write('0 @N1@ NOTE changed\n')
+            f.close()
+            self.assertFalse(Gedcom(path)._load_snapshot(snapshot))
+            g = Gedcom(path, snapshot=snapshot)
+            self.assertEqual(g.get_record('@N1@').value(), 'changed')
+            self.assertTrue(Gedcom(path)._load_snapshot(snapshot))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_snapshot_header(self):
+        """Check if files which aren't current snapshots are refused"""
+        tmp = tempfile.mkdtemp()
+        try:
+            path = os.path.join(tmp, 'mcintyre.ged')
+            shutil.copy(os.path.abspath('test/mcintyre.ged'), path)
+            old = os.path.join(tmp, 'old.snapshot')
+            f = open(old, 'wb')
+            marshal.dump((('simplepyged snapshot', 2), path, 0, 0, ''), f)
+            f.close()
+
+            for snapshot in [path, old]:
+                self.assertRaises(ValueError, Gedcom.load_snapshot, snapshot)
+                self.assertFalse(Gedcom(path)._load_snapshot(snapshot))
+
+            # an old snapshot is replaced when the file is parsed
+            g = Gedcom(path, snapshot=old)
+            self.assertEqual(len(Gedcom.load_snapshot(old).line_list()), len(g.line_list()))
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_selective(self):
+        """Check if parser skips records and tags which are not selected"""
+        path = os.path.abspath('test/mcintyre.ged')
+        record_types = ['INDI', 'FAM']
+        tags = ['NAME', 'BIRT', 'DEAT', 'FAMS', 'FAMC', 'HUSB', 'WIFE', 'CHIL']
+        g = Gedcom(path, record_types=record_types, tags=tags)
+
+        self.assertEqual(len(g.individual_list()), 41)
+        self.assertEqual(len(g.family_list()), 16)
+        for e in g.line_list():
+            if e.level() == 0:
+                self.assertTrue(e.tag() in record_types)
+            elif e.level() == 1:
+                self.assertTrue(e.tag() in tags)
+        self.assertEqual(len([e for e in g.line_list() if e.tag() == 'DATE']),
+                         len([e for e in self.g.line_list() if e.tag() == 'DATE' and e.parent_line().tag() in ['BIRT', 'DEAT']]))
+
+        mary = g.get_individual('@P405366386@')
+        self.assertEqual(mary.name(), ('Mary Christine', 'Hern'))
+        self.assertEqual(mary.birth().dateplace(), ('19 Nov 1923', 'Louisiana, USA'))
+        self.assertEqual(mary.father().children(), [mary])
+        self.assertEqual(mary.sex(), None)
+
+        expected = [e.gedcom() for e in g.line_list()]
+        for kwargs in [{'lazy': True}, {'columns': True}, {'workers': 2}]:
+            other = Gedcom(path, record_types=record_types, tags=tags, **kwargs)
+            self.assertEqual([e.gedcom() for e in other.line_list()], expected)
+
+    def test_lazy_bom(self):
+        """Check if lazily parsed Gedcom handles files with BOM"""
+        path = os.path.abspath('test/GedcomWithBOM.ged')
+        lazy = Gedcom(path, lazy=True)
+        self.assertEqual([e.gedcom() for e in lazy.line_list()], [e.gedcom() for e in Gedcom(path).line_list()])
+
+    def test_lazy_indented(self):
+        """Check if lazily parsed Gedcom finds indented records"""
+        path = os.path.abspath('test/indented.ged')
+        g = Gedcom(path)
+        lazy = Gedcom(path, lazy=True)
+        self.assertEqual(len(g.individual_list()), 41)
+        self.assertEqual(len(lazy.record_dict()), 57)
+        self.assertEqual([e.xref() for e in lazy.individual_list()], [e.xref() for e in g.individual_list()])
+        self.assertEqual([e.gedcom() for e in lazy.line_list()], [e.gedcom() for e in g.line_list()])
+
 
 if __name__ == '__main__':
     unittest.main()